@@ -1,3 +1,16 @@
 __version_info__ = '0.8.2'
 __version__ = '0.8.2'
 version = '0.8.2'
+
+default_app_config = 'adminlinks.apps.AdminlinksConfig'
+
+
+def links_for(*args, **kwargs):
+    """
+    Shortcut for :func:`adminlinks.api.links_for`, which is only imported
+    when used, so that importing :mod:`adminlinks` doesn't need settings.
+
+    .. versionadded:: 0.9.0
+    """
+    from adminlinks.api import links_for
+    return links_for(*args, **kwargs)
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 from itertools import chain
 import logging
+from threading import Lock
+try:
+    from collections import OrderedDict
+except ImportError:  # Python 2.6
+    from django.utils.datastructures import SortedDict as OrderedDict
 from django.utils.html import escape
 
 try:
@@ -10,21 +15,40 @@ try:
 except (ImportError, AttributeError) as e:  # Python 2, < Django 1.5
     from urlparse import urlsplit, urlunsplit
 from django.contrib.admin import helpers
-from django.contrib.admin.options import csrf_protect_m
+from django.contrib.admin.options import ModelAdmin, csrf_protect_m
 try:
     from django.contrib.admin.utils import unquote
 except ImportError:  # < 1.7 ... pragma: no cover
     from django.contrib.admin.util import unquote
+from django import VERSION as DJANGO_VERSION
+from django.conf import settings
 from django.contrib.auth import REDIRECT_FIELD_NAME
-from django.core.exceptions import PermissionDenied
+try:
+    from django.contrib.staticfiles.templatetags.staticfiles import static
+except ImportError:  # < Django 1.4
+    def static(path):
+        return '%s%s' % (settings.STATIC_URL or '', path)
+try:
+    from django.core.signals import setting_changed
+except ImportError:  # < Django 1.8
+    from django.test.signals import setting_changed
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.urlresolvers import reverse
+from django.db.models import FileField
+from django.db.models.fields import FieldDoesNotExist
+from django.dispatch import receiver
 from django.db import transaction
 try:
     from django.db.transaction import atomic
 except ImportError:
     from django.db.transaction import commit_on_success as atomic
 from django.forms.models import fields_for_model
-from django.http import Http404, QueryDict
-from django.shortcuts import render_to_response
+from django.http import (Http404, HttpResponse, HttpResponseBadRequest,
+                         HttpResponseNotAllowed, HttpResponseRedirect,
+                         QueryDict)
+from django.template import Context
+from django.template import loader as template_loader
+from django.template.loader import select_template
 try:
     from django.utils.encoding import force_text
 except ImportError:  # < Django 1.5
@@ -38,15 +62,103 @@ except ImportError as e:
     from django.utils import simplejson as json
     from django.utils.functional import update_wrapper
 
+from django.utils import timezone
 from django.utils.safestring import mark_safe
-from django.utils.translation import ugettext as _
+from django.utils.translation import ugettext as _, get_language
+from django.utils.cache import add_never_cache_headers, patch_vary_headers
+from django.views.decorators.cache import never_cache
 from adminlinks.changelist import AdminlinksChangeList
-from adminlinks.constants import DATA_CHANGED, AUTOCLOSING
+from adminlinks.constants import (DATA_CHANGED, AUTOCLOSING, EDITOR_COOKIE,
+                                  MODELADMIN_REVERSE)
 
 
 logger = logging.getLogger(__name__)
 
 
+class _LRUCache(object):
+    """
+    A dictionary holding at most `maxsize` items, forgetting whichever was
+    used longest ago. Safe to share between threads.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                del self._data[next(iter(self._data))]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+#: the fields and form class used by
+#: :meth:`~adminlinks.admin.AdminlinksMixin.change_field_view`, for each
+#: :class:`~django.contrib.admin.ModelAdmin` and field.
+_change_field_forms = _LRUCache(
+    maxsize=getattr(settings, 'ADMINLINKS_FORM_CACHE_SIZE', 128))
+
+#: returned instead of the success template, when
+#: :attr:`~adminlinks.admin.AdminlinksMixin.success_post_message` is set.
+_SUCCESS_MESSAGE_SHELL = (
+    '<!DOCTYPE html><html><head><title>Closing&hellip;</title>'
+    '<script type="application/json" id="django-adminlinks-success">%(json)s'
+    '</script><script src="%(script)s"></script></head><body></body></html>')
+
+#: characters which could end the <script> element the JSON is in.
+_JSON_SCRIPT_ESCAPES = (('&', '\\u0026'), ('<', '\\u003c'), ('>', '\\u003e'))
+
+
+#: the success template found for each
+#: :class:`~django.contrib.admin.ModelAdmin`, language and list of candidates,
+#: while the template loaders stay the same.
+_success_templates = _LRUCache(maxsize=128)
+_success_templates.loaders = None
+
+
+@receiver(setting_changed)
+def _clear_success_templates(sender, setting, **kwargs):
+    if setting.startswith('TEMPLATE'):
+        _success_templates.clear()
+
+
+#: custom changelist classes, with
+#: :class:`~adminlinks.changelist.AdminlinksChangeList` mixed in, for each
+#: original class.
+_patched_changelists = _LRUCache(maxsize=64)
+
+
+def _only_fields(queryset, fields):
+    """
+    Restricts `queryset` to the columns for `fields`, and the primary key.
+    """
+    # before Django 1.5, saving a deferred instance saves every field,
+    # loading each of the deferred ones first.
+    if DJANGO_VERSION < (1, 5):
+        return queryset
+    opts = queryset.model._meta
+    columns = set(f.name for f in opts.fields)
+    only = [name for name in fields if name in columns]
+    return queryset.only(opts.pk.name, *only)
+
+
 class AdminUrlWrap(object):
     """
     A minor helper for mixing into :class:`~django.contrib.admin.ModelAdmin`
@@ -80,6 +192,134 @@ class AdminUrlWrap(object):
         return wrap
 
 
+class AdminlinksSiteMixin(object):
+    """
+    A mixin for :class:`~django.contrib.admin.AdminSite` subclasses, adding
+    the views which replace placeholders and ESI includes (see
+    :mod:`~adminlinks.placeholders`) with the links the current user may
+    see::
+
+        from django.contrib.admin import AdminSite
+
+        class MyAdminSite(AdminlinksSiteMixin, AdminSite):
+            pass
+
+    Every response from the admin site sets (or removes) a cookie saying
+    whether the user may see any links, so that the
+    :ref:`bundled JavaScript <bundled_js>` only asks for placeholders to be
+    filled in for editors, and everyone else never leaves the cached page.
+
+    .. versionadded:: 0.9.0
+    """
+
+    def admin_view(self, view, cacheable=False):
+        inner = super(AdminlinksSiteMixin, self).admin_view(view, cacheable)
+
+        def wrapper(request, *args, **kwargs):
+            response = inner(request, *args, **kwargs)
+            return self.set_editor_cookie(request, response)
+        return update_wrapper(wrapper, inner)
+
+    def set_editor_cookie(self, request, response):
+        """
+        Sets :data:`~adminlinks.constants.EDITOR_COOKIE` on the `response`
+        if the user may see links, for as long as their session lasts, and
+        deletes it once they may not (eg: after signing out).
+
+        :return: the same `response`
+        """
+        from adminlinks.templatetags.utils import context_passes_test
+        if context_passes_test({'request': request}):
+            if EDITOR_COOKIE not in request.COOKIES:
+                max_age = settings.SESSION_COOKIE_AGE
+                if settings.SESSION_EXPIRE_AT_BROWSER_CLOSE:
+                    max_age = None
+                response.set_cookie(EDITOR_COOKIE, '1', max_age=max_age,
+                                    domain=settings.SESSION_COOKIE_DOMAIN,
+                                    secure=settings.SESSION_COOKIE_SECURE)
+        elif EDITOR_COOKIE in request.COOKIES:
+            response.delete_cookie(EDITOR_COOKIE,
+                                   domain=settings.SESSION_COOKIE_DOMAIN)
+        return response
+
+    def get_urls(self):
+        urls = super(AdminlinksSiteMixin, self).get_urls()
+        from django.conf.urls import url
+        new_urls = [
+            url(regex=r'^adminlinks/placeholders/$',
+                view=self.placeholders_view,
+                name='adminlinks_placeholders'),
+            url(regex=r'^adminlinks/fragment/$',
+                view=self.fragment_view,
+                name='adminlinks_fragment'),
+        ]
+        urls[0:0] = new_urls
+        return urls
+
+    @never_cache
+    @csrf_protect_m
+    def placeholders_view(self, request):
+        """
+        Accepts a JSON ``POST`` of every placeholder on a page::
+
+            {"placeholders": [{"id": "1", "tag": "render_edit_button",
+                               "model": "app.model", "pk": "1",
+                               "arguments": {"admin_site": "admin",
+                                             "querystring": ""}}]}
+
+        and responds with the HTML to replace each one with, keyed by ``id``::
+
+            {"html": {"1": "<a href=...>...</a>"}}
+
+        Users who wouldn't see any links get nothing back, rather than being
+        redirected to the login page, and have the cookie set by
+        :meth:`~adminlinks.admin.AdminlinksSiteMixin.set_editor_cookie`
+        removed, so they won't ask again.
+        """
+        if request.method != 'POST':
+            return HttpResponseNotAllowed(['POST'])
+        try:
+            data = json.loads(force_text(request.body))
+            placeholders = data['placeholders']
+        except (ValueError, KeyError, TypeError):
+            return HttpResponseBadRequest()
+        if not isinstance(placeholders, list):
+            return HttpResponseBadRequest()
+        from adminlinks.placeholders import render_placeholders
+        html = render_placeholders(request, self, placeholders)
+        response = HttpResponse(json.dumps({'html': html}),
+                                content_type='application/json')
+        return self.set_editor_cookie(request, response)
+
+    @never_cache
+    def fragment_view(self, request):
+        """
+        Renders a single template tag, described by the querystring, for an
+        ``<esi:include>``::
+
+            ?tag=render_edit_button&model=app.model&pk=1&arguments={...}
+
+        The response is empty for users who wouldn't see any links, and for
+        anything which couldn't have been rendered by a template tag.
+        """
+        try:
+            arguments = json.loads(request.GET.get('arguments', '{}'))
+        except ValueError:
+            return HttpResponseBadRequest()
+        placeholder = {
+            'id': 'fragment',
+            'tag': request.GET.get('tag'),
+            'model': request.GET.get('model', ''),
+            'pk': request.GET.get('pk', ''),
+            'arguments': arguments,
+        }
+        from adminlinks.placeholders import render_placeholders
+        html = render_placeholders(request, self, [placeholder])
+        response = HttpResponse(html.get('fragment', ''))
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
 class AdminlinksMixin(AdminUrlWrap):
     """
     Our mixin, which serves two purposes:
@@ -107,17 +347,34 @@ class AdminlinksMixin(AdminUrlWrap):
 
     """
 
+    #: Whether popups are closed by a tiny page which sends the data from
+    #: the ``get_response_*_context`` methods to the page which opened it,
+    #: using ``window.postMessage``, instead of rendering
+    #: :meth:`~adminlinks.admin.AdminlinksMixin.get_success_template`. The
+    #: data is only sent to pages on the admin's own origin, and doesn't need
+    #: jQuery in the opening page, only the
+    #: :ref:`bundled JavaScript <bundled_js>`.
+    #:
+    #: .. versionadded:: 0.9.0
+    success_post_message = False
+
     @csrf_protect_m
-    @atomic
     def change_field_view(self, request, object_id, fieldname, extra_context=None):
         """
         Allows a user to view a form with only one field (named in the URL args)
         to edit. All others are ignored.
+
+        .. versionchanged:: 0.9.0
+            only the columns used by the form are fetched (see
+            :meth:`~adminlinks.admin.AdminlinksMixin.get_change_field_object`)
+            and only saving the form happens in a transaction.
         """
         model = self.model
         opts = model._meta
 
-        obj = self.get_object(request, unquote(object_id))
+        fields = self._get_change_field_fields(fieldname)
+        obj = self.get_change_field_object(request, unquote(object_id),
+                                           fields[0] if fields else ())
 
         if not self.has_change_permission(request, obj):
             raise PermissionDenied
@@ -125,48 +382,17 @@ class AdminlinksMixin(AdminUrlWrap):
         if obj is None:
             raise Http404(_('%(name)s object with primary key %(key)r does not exist.') % {'name': force_text(opts.verbose_name), 'key': escape(object_id)})
 
-        all_fields = set(chain(fields_for_model(obj), self.form.base_fields))
-
-        if fieldname not in all_fields:
-            raise Http404(_('%(field)s does not exist on this object') % {'field': force_text(fieldname)})
-
-        # if there are important fields, we'll assume they're denoted by a
-        # leading underscore, like in treebeard
-
-        fields_to_include = [x for x in all_fields
-                             if x == fieldname or x.startswith('_')]
-        fields_to_exclude = [x for x in all_fields
-                             if x != fieldname and not x.startswith('_')]
-        unique_together = frozenset(obj._meta.unique_together)
-        if len(unique_together) > 0 and fieldname in unique_together:
-            fields_to_include.extend(unique_together)
-            fields_to_exclude = [x for x in fields_to_exclude
-                                 if x not in unique_together]
-
-        logger.debug("Excluding fields: {0!r}".format(fields_to_exclude))
-        logger.debug("Including fields: {0!r}".format(fields_to_include))
-        ModelForm = self.get_form(request, obj, exclude=fields_to_exclude,
-                                  fields=fields_to_include)
+        fields_to_include, fields_to_exclude, ModelForm = \
+            self.get_change_field_form(request, obj, fieldname)
 
         if request.method == 'POST':
             form = ModelForm(request.POST, request.FILES, instance=obj)
             if form.is_valid():
-                form_validated = True
-                new_object = self.save_form(request, form, change=True)
+                new_object = self._save_change_field_form(request, form)
+                return self.response_change(request, new_object)
             else:
                 logger.debug('{cls!r} instance was invalid: {errors!r}'.format(
                     errors=form.errors, cls=form))
-                form_validated = False
-                new_object = obj
-
-            if form_validated:
-                self.save_model(request, new_object, form, change=True)
-                form.save_m2m()
-
-                change_message = self.construct_change_message(request, form,
-                                                               formsets=None)
-                self.log_change(request, new_object, change_message)
-                return self.response_change(request, new_object)
 
         else:
             form = ModelForm(instance=obj)
@@ -202,11 +428,397 @@ class AdminlinksMixin(AdminUrlWrap):
         context.update(extra_context or {})
         # tidy up after ourselves; by this point we don't need anything much ...
         # print(', '.join(locals().keys()))
-        del (all_fields, adminForm, form, ModelForm, media, object_id,
+        del (adminForm, form, ModelForm, media, object_id,
              fields_to_exclude, fieldname, model, extra_context,
              the_fieldset, opts)
         return self.render_change_form(request, context, obj=obj)
 
+    def _save_change_field_form(self, request, form):
+        with atomic():
+            new_object = self.save_form(request, form, change=True)
+            self.save_model(request, new_object, form, change=True)
+            form.save_m2m()
+
+            change_message = self.construct_change_message(
+                request, form, formsets=None)
+            self.log_change(request, new_object, change_message)
+        return new_object
+
+    @csrf_protect_m
+    def change_field_json(self, request, object_id, fieldname):
+        """
+        Changes a single field, like
+        :meth:`~adminlinks.admin.AdminlinksMixin.change_field_view`, without
+        rendering any of the admin. Accepts a ``PATCH`` (or ``POST``) of::
+
+            {"value": true}
+
+        and responds with the JSON from
+        :meth:`~adminlinks.admin.AdminlinksMixin.get_response_change_context`,
+        or a ``400`` with the form's ``errors``.
+
+        Only fields which are edited on their own, and which don't need a file
+        uploaded, may be changed this way. The
+        :ref:`bundled JavaScript <bundled_js>` uses this for simple fields,
+        instead of opening the popup.
+
+        .. versionadded:: 0.9.0
+        """
+        if request.method not in ('PATCH', 'POST'):
+            return HttpResponseNotAllowed(['PATCH', 'POST'])
+        try:
+            value = json.loads(force_text(request.body))['value']
+        except (ValueError, KeyError, TypeError):
+            return HttpResponseBadRequest()
+
+        opts = self.model._meta
+        fields = self._get_change_field_fields(fieldname)
+        obj = self.get_change_field_object(request, unquote(object_id),
+                                           fields[0] if fields else ())
+
+        if not self.has_change_permission(request, obj):
+            raise PermissionDenied
+
+        if obj is None:
+            raise Http404(_('%(name)s object with primary key %(key)r does not exist.') % {'name': force_text(opts.verbose_name), 'key': escape(object_id)})
+
+        if self._get_single_field(fieldname) is None:
+            raise Http404(_('%(field)s does not exist on this object') % {'field': force_text(fieldname)})
+
+        fields_to_include, fields_to_exclude, ModelForm = \
+            self.get_change_field_form(request, obj, fieldname)
+        form = ModelForm({fieldname: value}, instance=obj)
+        if not form.is_valid():
+            errors = dict((key, [force_text(error) for error in value])
+                          for key, value in form.errors.items())
+            return HttpResponseBadRequest(json.dumps({'errors': errors}),
+                                          content_type='application/json')
+        new_object = self._save_change_field_form(request, form)
+        ctx_dict = self.get_response_change_context(request, new_object)
+        return HttpResponse(json.dumps(ctx_dict),
+                            content_type='application/json')
+
+    @csrf_protect_m
+    def change_field_bulk(self, request, fieldname, extra_context=None):
+        """
+        Like :meth:`~adminlinks.admin.AdminlinksMixin.change_field_view`, but
+        sets the field to the same value for every object whose primary key is
+        in the comma separated ``pks`` parameter::
+
+            /admin/app/model/change_field/fieldname/?pks=1,2,3
+
+        The value is validated once, by a form for the first object, and then
+        saved with a single :meth:`~django.db.models.query.QuerySet.update`,
+        so :meth:`~django.contrib.admin.ModelAdmin.save_model`, the model's
+        ``save`` and its signals are not used; fields with ``auto_now`` are
+        still set to the current time. Only fields which
+        :meth:`~adminlinks.admin.AdminlinksMixin.change_field_view` would show
+        on their own, and which aren't unique, files or many-to-many, may be
+        changed this way.
+
+        Requires the *change* permission for every object (see
+        :meth:`~adminlinks.admin.AdminlinksMixin.get_permitted_objects`).
+
+        .. versionadded:: 0.9.0
+        """
+        model = self.model
+        opts = model._meta
+
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+
+        fields = self._get_change_field_fields(fieldname)
+        if fields is None or not self.can_change_field_in_bulk(fieldname):
+            raise Http404(_('%(field)s does not exist on this object') % {'field': force_text(fieldname)})
+
+        try:
+            pks = [opts.pk.to_python(pk)
+                   for pk in request.REQUEST.get('pks', '').split(',') if pk]
+        except ValidationError:
+            return HttpResponseBadRequest()
+        if hasattr(self, 'get_queryset'):
+            queryset = self.get_queryset(request)
+        else:  # < Django 1.6
+            queryset = self.queryset(request)
+        # whole rows, as every object's __str__ is needed for the log.
+        objs = list(queryset.filter(pk__in=pks))
+        if not objs:
+            raise Http404(_('%(name)s object with primary key %(key)r does not exist.') % {'name': force_text(opts.verbose_name), 'key': escape(request.REQUEST.get('pks', ''))})
+        permitted = self.get_permitted_objects(request, objs, 'change')
+        if permitted is not None:
+            permitted = set(getattr(item, 'pk', item) for item in permitted)
+            if any(obj.pk not in permitted for obj in objs):
+                raise PermissionDenied
+
+        fields_to_include, fields_to_exclude, ModelForm = \
+            self.get_change_field_form(request, objs[0], fieldname)
+
+        if request.method == 'POST':
+            form = ModelForm(request.POST, request.FILES, instance=objs[0])
+            if form.is_valid():
+                value = form.cleaned_data[fieldname]
+                change_message = self.construct_change_message(
+                    request, form, formsets=None)
+                values = {fieldname: value}
+                # update() leaves these alone, unlike save().
+                for field in opts.fields:
+                    if getattr(field, 'auto_now', False) and field.name != fieldname:
+                        values[field.name] = field.pre_save(objs[0], False)
+                with atomic():
+                    queryset.filter(pk__in=[obj.pk for obj in objs]).update(
+                        **values)
+                    self.log_change_bulk(request, objs, change_message)
+                return self.response_change_bulk(request, objs)
+            else:
+                logger.debug('{cls!r} instance was invalid: {errors!r}'.format(
+                    errors=form.errors, cls=form))
+        else:
+            form = ModelForm(instance=objs[0])
+
+        adminForm = helpers.AdminForm(form, [(None, {'fields': [fieldname]})],
+                                      prepopulated_fields={},
+                                      readonly_fields=None, model_admin=self)
+        context = {
+            'title': _('Change %(field)s for %(count)d %(name)s') % {
+                'field': force_text(opts.get_field(fieldname).verbose_name),
+                'count': len(objs),
+                'name': force_text(opts.verbose_name_plural)},
+            'adminform': adminForm,
+            'object_id': None,
+            'original': None,
+            'bulk_objects': objs,
+            'show_delete': False,
+            'media': mark_safe(self.media + adminForm.media),
+            'errors': helpers.AdminErrorList(form, inline_formsets=[]),
+            'root_path': getattr(self.admin_site, 'root_path', None),
+            'app_label': opts.app_label,
+            'is_popup': "_popup" in request.REQUEST,
+        }
+        context.update(extra_context or {})
+        response = self.render_change_form(request, context, change=True)
+        change_form_template = response.template_name
+        if isinstance(change_form_template, (list, tuple)):
+            change_form_template = select_template(change_form_template)
+        # there's no one object for the history and "view on site" links.
+        response.context_data.update({
+            'has_absolute_url': False,
+            'change_form_template': change_form_template,
+        })
+        response.template_name = 'adminlinks/change_field_bulk.html'
+        return response
+
+    def can_change_field_in_bulk(self, fieldname):
+        """
+        :return: whether
+                 :meth:`~adminlinks.admin.AdminlinksMixin.change_field_bulk`
+                 may be used for `fieldname`.
+
+        .. versionadded:: 0.9.0
+        """
+        field = self._get_single_field(fieldname)
+        return field is not None and not field.unique
+
+    def can_change_field_inline(self, fieldname):
+        """
+        :return: whether
+                 :meth:`~adminlinks.admin.AdminlinksMixin.change_field_json`
+                 may be used for `fieldname`.
+
+        .. versionadded:: 0.9.0
+        """
+        return self._get_single_field(fieldname) is not None
+
+    def _get_single_field(self, fieldname):
+        """
+        :return: the model field, if it's edited on its own by
+                 :meth:`~adminlinks.admin.AdminlinksMixin.change_field_view`
+                 and is a plain column, rather than a file or many-to-many.
+        """
+        fields = self._get_change_field_fields(fieldname)
+        if fields is None or fields[0] != [fieldname]:
+            return None
+        try:
+            field = self.model._meta.get_field(fieldname)
+        except FieldDoesNotExist:
+            return None
+        if (field.primary_key or isinstance(field, FileField)
+                or field not in self.model._meta.fields):
+            return None
+        return field
+
+    def log_change_bulk(self, request, objs, message):
+        """
+        Like :meth:`~django.contrib.admin.ModelAdmin.log_change`, but adds
+        the entries for every object in one query.
+
+        .. versionadded:: 0.9.0
+        """
+        from django.contrib.admin.models import LogEntry, CHANGE
+        from django.contrib.contenttypes.models import ContentType
+        content_type = ContentType.objects.get_for_model(self.model)
+        now = timezone.now()
+        LogEntry.objects.bulk_create([
+            LogEntry(user_id=request.user.pk,
+                     content_type_id=content_type.pk,
+                     object_id=force_text(obj.pk),
+                     object_repr=force_text(obj)[:200],
+                     action_flag=CHANGE,
+                     change_message=message,
+                     action_time=now)
+            for obj in objs])
+
+    def response_change_bulk(self, request, objs):
+        """
+        What :meth:`~adminlinks.admin.AdminlinksMixin.change_field_bulk`
+        responds with after saving; either the success template, or a
+        redirect to the changelist.
+
+        .. versionadded:: 0.9.0
+        """
+        if self.should_autoclose(request):
+            ctx_dict = self.get_response_change_context(request, objs[0])
+            ctx_dict['objects'] = [{'pk': obj._get_pk_val(),
+                                    'id': obj._get_pk_val()} for obj in objs]
+            return self.render_success_response(request, ctx_dict)
+        opts = self.model._meta
+        self.message_user(request, _('%(count)d %(name)s were changed successfully.') % {
+            'count': len(objs), 'name': force_text(opts.verbose_name_plural)})
+        response = HttpResponseRedirect(reverse(MODELADMIN_REVERSE % {
+            'namespace': self.admin_site.name,
+            'app': opts.app_label,
+            'module': opts.object_name.lower(),
+            'view': 'changelist'}))
+        return self.maybe_fix_redirection(request, response)
+
+    def get_change_field_form(self, request, obj, fieldname):
+        """
+        Works out which fields to show when editing `fieldname`, and builds
+        the :class:`~django.forms.ModelForm` for them, using
+        :meth:`~django.contrib.admin.ModelAdmin.get_form`.
+
+        The fields are cached, keeping the most recently used
+        ``ADMINLINKS_FORM_CACHE_SIZE`` (default **128**) across all admins.
+        The form class is built for each request, as its fields may depend
+        on it, unless
+        :meth:`~adminlinks.admin.AdminlinksMixin.get_change_field_form_cache_key`
+        is overridden.
+
+        .. versionadded:: 0.9.0
+
+        :return: the fields included and excluded, and the form class.
+        :rtype: :data:`tuple`
+        :raises: :exc:`~django.http.Http404` if the model has no such field.
+        """
+        key = self.get_change_field_form_cache_key(request, obj, fieldname)
+        if key is not None:
+            key = (self, fieldname, key)
+            cached = _change_field_forms.get(key)
+            if cached is not None:
+                return cached
+
+        fields = self._get_change_field_fields(fieldname)
+        if fields is None:
+            raise Http404(_('%(field)s does not exist on this object') % {'field': force_text(fieldname)})
+        fields_to_include, fields_to_exclude = fields
+
+        logger.debug("Excluding fields: {0!r}".format(fields_to_exclude))
+        logger.debug("Including fields: {0!r}".format(fields_to_include))
+        ModelForm = self.get_form(request, obj, exclude=fields_to_exclude,
+                                  fields=fields_to_include)
+        result = (fields_to_include, fields_to_exclude, ModelForm)
+        if key is not None:
+            _change_field_forms.set(key, result)
+        return result
+
+    def _get_change_field_fields(self, fieldname):
+        """
+        :return: the fields to include and exclude when editing `fieldname`,
+                 or :data:`None` if there's no such field.
+        """
+        key = (self, fieldname)
+        fields = _change_field_forms.get(key)
+        if fields is not None:
+            return fields
+
+        all_fields = set(chain(fields_for_model(self.model),
+                               getattr(self.form, 'base_fields', ())))
+
+        if fieldname not in all_fields:
+            return None
+
+        # if there are important fields, we'll assume they're denoted by a
+        # leading underscore, like in treebeard
+
+        fields_to_include = [x for x in all_fields
+                             if x == fieldname or x.startswith('_')]
+        fields_to_exclude = [x for x in all_fields
+                             if x != fieldname and not x.startswith('_')]
+        unique_together = frozenset(self.model._meta.unique_together)
+        if len(unique_together) > 0 and fieldname in unique_together:
+            fields_to_include.extend(unique_together)
+            fields_to_exclude = [x for x in fields_to_exclude
+                                 if x not in unique_together]
+        fields = (fields_to_include, fields_to_exclude)
+        _change_field_forms.set(key, fields)
+        return fields
+
+    def get_change_field_object(self, request, object_id, fields):
+        """
+        Like :meth:`~django.contrib.admin.ModelAdmin.get_object`, but only
+        fetches the columns for `fields` (and the primary key), using
+        :meth:`~django.db.models.query.QuerySet.only`, so that large columns
+        the form doesn't show aren't read. Anything else is loaded if it is
+        used, such as by the model's ``__str__``.
+
+        If :meth:`~django.contrib.admin.ModelAdmin.get_object` has been
+        overridden, it is used instead, and every column is fetched.
+
+        .. versionadded:: 0.9.0
+
+        :param object_id: the primary key, from the url.
+        :param fields: names of the fields on the form.
+        :return: the object, or :data:`None` if it doesn't exist.
+        """
+        get_object = type(self).get_object
+        if getattr(get_object, '__func__', get_object) is not \
+                getattr(ModelAdmin.get_object, '__func__', ModelAdmin.get_object):
+            return self.get_object(request, object_id)
+        if hasattr(self, 'get_queryset'):
+            queryset = self.get_queryset(request)
+        else:  # < Django 1.6
+            queryset = self.queryset(request)
+        model = queryset.model
+        queryset = _only_fields(queryset, fields)
+        try:
+            object_id = model._meta.pk.to_python(object_id)
+            return queryset.get(pk=object_id)
+        except (model.DoesNotExist, ValidationError, ValueError):
+            return None
+
+    def get_change_field_form_cache_key(self, request, obj, fieldname):
+        """
+        The form class built for
+        :meth:`~adminlinks.admin.AdminlinksMixin.change_field_view` is reused
+        for every request which gives the same key, along with the same
+        :class:`~django.contrib.admin.ModelAdmin` and field.
+
+        By default, this is :data:`None`, and the form is built every time;
+        :meth:`~django.contrib.admin.ModelAdmin.get_form` binds the request
+        into its ``formfield_for_*`` methods, which may limit choices or
+        related links per user. If yours don't depend on the request, or you
+        can include everything they do depend on, override this to reuse the
+        form::
+
+            def get_change_field_form_cache_key(self, request, obj, fieldname):
+                return (request.user.is_superuser,
+                        tuple(self.get_readonly_fields(request, obj)))
+
+        .. versionadded:: 0.9.0
+
+        :return: something hashable, or :data:`None`
+        """
+        return None
+
     def get_urls(self):
         urls = super(AdminlinksMixin, self).get_urls()
         from django.conf.urls import url
@@ -224,8 +836,53 @@ class AdminlinksMixin(AdminUrlWrap):
             name='{app}_{model}_change_field'.format(app=app_label,
                                                      model=model_name))
         urls.insert(0, new_url)
+        bulk_url = url(
+            regex=r'^change_field/(?P<fieldname>[\w_]+)/$',
+            view=self._get_wrap()(self.change_field_bulk),
+            name='{app}_{model}_change_field_bulk'.format(app=app_label,
+                                                          model=model_name))
+        urls.insert(0, bulk_url)
+        json_url = url(
+            regex=r'^(?P<object_id>.+)/change_field/(?P<fieldname>[\w_]+)/json/$',
+            view=self._get_wrap()(self.change_field_json),
+            name='{app}_{model}_change_field_json'.format(app=app_label,
+                                                          model=model_name))
+        urls.insert(0, json_url)
         return urls
 
+    def get_permitted_objects(self, request, objs, action):
+        """
+        Used by the template tags, :func:`~adminlinks.api.links_for` and
+        :meth:`~adminlinks.admin.AdminlinksMixin.change_field_bulk` to find
+        out which objects the current user may use `action` on, so that links
+        the admin would refuse aren't shown.
+
+        By default, returns :data:`None`, meaning the permissions for the
+        whole model (which is all Django's own ``has_<action>_permission``
+        methods look at) apply to every object, and nothing more is checked.
+        If your permissions depend on the object, override this to answer for
+        the whole list at once, with a single query::
+
+            def get_permitted_objects(self, request, objs, action):
+                if action == 'add':
+                    return None
+                owned = self.model._default_manager.filter(
+                    pk__in=[obj.pk for obj in objs], owner=request.user)
+                return owned.values_list('pk', flat=True)
+
+        The answers are remembered for the rest of the request.
+
+        .. versionadded:: 0.9.0
+
+        :param request: the current :class:`~django.http.HttpRequest`
+        :param objs: a list of instances of this model, with primary keys.
+        :param action: one of ``add``, ``change`` or ``delete``
+        :return: the permitted objects, or their primary keys, or
+                 :data:`None` if only the model's permissions matter.
+        :rtype: iterable or :data:`None`
+        """
+        return None
+
     def get_success_templates(self, request):
         """
         Forces the attempted loading of the following:
@@ -250,13 +907,80 @@ class AdminlinksMixin(AdminUrlWrap):
             app_label = parent._meta.app_label
             model_name = parent._meta.object_name.lower()
             templates.extend([
-                "adminlinks/%s/%s/ssuccess.html" % (app_label, model_name),
+                "adminlinks/%s/%s/success.html" % (app_label, model_name),
                 "adminlinks/%s/success.html" % app_label,
             ])
         templates.extend(['adminlinks/success.html'])
         del app_label, model_name, any_parents
         return templates
 
+    def get_success_template(self, request):
+        """
+        Finds the first of
+        :meth:`~adminlinks.admin.AdminlinksMixin.get_success_templates`
+        which exists. Unless ``DEBUG`` is on, the answer is remembered for
+        each :class:`~django.contrib.admin.ModelAdmin`, language and list of
+        templates, until the template loaders change.
+
+        .. versionadded:: 0.9.0
+
+        :return: the template to render.
+        :rtype: :class:`~django.template.Template`
+        """
+        candidates = tuple(self.get_success_templates(request))
+        if settings.DEBUG:
+            return select_template(candidates)
+        if template_loader.template_source_loaders is not _success_templates.loaders:
+            _success_templates.clear()
+        key = (self, get_language(), candidates)
+        template = _success_templates.get(key)
+        if template is None:
+            template = select_template(candidates)
+            _success_templates.loaders = template_loader.template_source_loaders
+            _success_templates.set(key, template)
+        return template
+
+    def render_success_response(self, request, ctx_dict):
+        """
+        Renders the template from
+        :meth:`~adminlinks.admin.AdminlinksMixin.get_success_template`, which
+        closes the popup, given the data from one of the
+        ``get_response_*_context`` methods.
+
+        .. versionadded:: 0.9.0
+
+        :rtype: :class:`~django.http.HttpResponse`
+        """
+        if self.success_post_message:
+            return self.render_success_message(request, ctx_dict)
+        context = {'data': ctx_dict, 'json': json.dumps(ctx_dict)}
+        template = self.get_success_template(request)
+        return HttpResponse(template.render(Context(context)))
+
+    def render_success_message(self, request, ctx_dict):
+        """
+        Used by
+        :meth:`~adminlinks.admin.AdminlinksMixin.render_success_response`
+        if :attr:`~adminlinks.admin.AdminlinksMixin.success_post_message` is
+        set. Nothing is rendered; the data is put into a fixed page, which
+        loads ``adminlinks/js/success.js`` to post it to the opening page.
+        That script never changes, so may be served with far-future expiry
+        headers.
+
+        .. versionadded:: 0.9.0
+
+        :rtype: :class:`~django.http.HttpResponse`
+        """
+        payload = json.dumps(ctx_dict)
+        for char, replacement in _JSON_SCRIPT_ESCAPES:
+            payload = payload.replace(char, replacement)
+        response = HttpResponse(_SUCCESS_MESSAGE_SHELL % {
+            'json': payload,
+            'script': escape(static('adminlinks/js/success.js')),
+        })
+        add_never_cache_headers(response)
+        return response
+
     def wants_to_autoclose(self, request):
         """
         .. versionadded:: 0.8.1
@@ -376,10 +1100,7 @@ class AdminlinksMixin(AdminUrlWrap):
         """
         if self.should_autoclose(request):
             ctx_dict = self.get_response_change_context(request, obj)
-            ctx_json = json.dumps(ctx_dict)
-            context = {'data': ctx_dict, 'json': ctx_json}
-            return render_to_response(self.get_success_templates(request),
-                                      context)
+            return self.render_success_response(request, ctx_dict)
         response = super(AdminlinksMixin, self).response_change(request, obj,
                                                                 *args, **kwargs)
         return self.maybe_fix_redirection(request, response, obj)
@@ -391,10 +1112,7 @@ class AdminlinksMixin(AdminUrlWrap):
         """
         if self.should_autoclose(request):
             ctx_dict = self.get_response_add_context(request, obj)
-            ctx_json = json.dumps(ctx_dict)
-            context = {'data': ctx_dict, 'json': ctx_json}
-            return render_to_response(self.get_success_templates(request),
-                                      context)
+            return self.render_success_response(request, ctx_dict)
         response = super(AdminlinksMixin, self).response_add(request, obj,
                                                              *args, **kwargs)
         return self.maybe_fix_redirection(request, response, obj)
@@ -412,11 +1130,8 @@ class AdminlinksMixin(AdminUrlWrap):
         if self.should_autoclose(request) and response.status_code in (301, 302):
             ctx_dict = self.get_response_delete_context(request, object_id,
                                                         extra_context)
-            ctx_json = json.dumps(ctx_dict)
-            context = {'data': ctx_dict, 'json': ctx_json}
-            response = render_to_response(self.get_success_templates(request),
-                                          context)
-            del context, ctx_dict, ctx_json
+            response = self.render_success_response(request, ctx_dict)
+            del ctx_dict
         return self.maybe_fix_redirection(request, response)
 
     def get_response_add_context(self, request, obj):
@@ -514,6 +1229,10 @@ class AdminlinksMixin(AdminUrlWrap):
 
         .. versionadded:: 0.8.1
 
+        .. versionchanged:: 0.9.0
+            the patched class is built (and warned about) once for each
+            custom changelist, rather than on every request.
+
         """
         cl = super(AdminlinksMixin, self).get_changelist(request, **kwargs)
         fits_requirements = (
@@ -522,9 +1241,11 @@ class AdminlinksMixin(AdminUrlWrap):
         )
         if all(fits_requirements):
             return cl
-        else:
-            logger.warning('Custom `ChangeList` discovered,'
+        patched = _patched_changelists.get(cl)
+        if patched is None:
+            logger.warning('Custom `ChangeList` discovered (%r), '
                            'AdminlinksChangeListMixin is being mixed in '
-                           'automatically. Hopefully it will work!')
-            cl = type('AutoPatchedChangeList', (AdminlinksChangeList, cl), {})
-        return cl
+                           'automatically. Hopefully it will work!', cl)
+            patched = type('AutoPatchedChangeList', (AdminlinksChangeList, cl), {})
+            _patched_changelists.set(cl, patched)
+        return patched
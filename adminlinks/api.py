@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Builds the same links as the template tags, from Python code, for use in
+places like JSON APIs::
+
+    from adminlinks import links_for
+
+    links = links_for(request, page.object_list)
+    for obj in page.object_list:
+        data = {'title': obj.title, 'edit': links[obj]['change']}
+
+.. versionadded:: 0.9.0
+"""
+from __future__ import unicode_literals
+try:
+    from collections import OrderedDict
+except ImportError:  # Python 2.6
+    from django.utils.datastructures import SortedDict as OrderedDict
+from adminlinks.templatetags.utils import (context_passes_test, get_admin_site,
+                                           get_modeladmin_index,
+                                           _get_model_key,
+                                           _resolve_admin_link)
+
+#: the links built by default for every object.
+DEFAULT_VIEWS = ('change', 'delete', 'history')
+
+#: views which need the object's primary key; the others are for the model.
+OBJECT_VIEWS = ('change', 'delete', 'history')
+
+#: every view a link may be built for.
+ALL_VIEWS = OBJECT_VIEWS + ('add', 'changelist')
+
+
+def _links_for(request, objects, views, admin_site, query, build_link):
+    unknown = set(views) - set(ALL_VIEWS)
+    if unknown:
+        raise ValueError('Unknown views: %s' % ', '.join(sorted(unknown)))
+    links = OrderedDict()
+    site = get_admin_site(admin_site)
+    if site is None or not context_passes_test({'request': request}):
+        return links
+    # permissions are checked the first time each model is seen, and shared
+    # with any template tags rendered during the same request.
+    index = get_modeladmin_index(request, site)
+    objects = [obj for obj in objects or ()
+               if getattr(obj, '_meta', None) is not None
+               and obj.pk is not None]
+    by_model = OrderedDict()
+    for obj in objects:
+        by_model.setdefault(_get_model_key(obj._meta), []).append(obj)
+    # object-level permissions are asked for once per model and view.
+    permitted = {}
+    for key, objs in by_model.items():
+        entry = index.get(key) or {}
+        for view in OBJECT_VIEWS:
+            if view in views and view in entry:
+                permitted[key, view] = index.get_permitted_pks(key, objs, view)
+
+    for obj in objects:
+        key = _get_model_key(obj._meta)
+        entry = index.get(key) or {}
+        item = {'object': obj, 'verbose_name': obj._meta.verbose_name}
+        for view in views:
+            urlname = entry.get(view)
+            if urlname is None:
+                item[view] = ''
+            elif view in OBJECT_VIEWS:
+                pks = permitted.get((key, view))
+                if pks is not None and obj.pk not in pks:
+                    item[view] = ''
+                else:
+                    item[view] = build_link(urlname, [obj.pk], query)
+            else:
+                item[view] = build_link(urlname, None, query)
+        links[obj] = item
+    return links
+
+
+def links_for(request, objects, views=DEFAULT_VIEWS, admin_site='admin',
+              query=None):
+    """
+    Builds the admin links for every object in `objects`, testing the
+    permissions for each :class:`~django.contrib.admin.ModelAdmin` only once,
+    however many of its objects there are. Object-level permissions, if the
+    :class:`~django.contrib.admin.ModelAdmin` uses
+    :class:`~adminlinks.admin.AdminlinksMixin`, are tested with one call to
+    :meth:`~adminlinks.admin.AdminlinksMixin.get_permitted_objects` per model
+    and permission.
+
+    :param request: the current :class:`~django.http.HttpRequest`, with a
+                    ``user``.
+    :param objects: any iterable of :class:`~django.db.models.Model`
+                    instances, such as a page of a
+                    :class:`~django.db.models.query.QuerySet`
+    :param views: which links to build; any of ``change``, ``delete``,
+                  ``history``, ``add`` and ``changelist``.
+    :param admin_site: name of the admin site to use; defaults to **"admin"**
+    :param query: a querystring to include in every link.
+    :return: for each object, in order, a dictionary of the ``object``, its
+             ``verbose_name`` and a link for each view, which is an empty
+             string if the user may not use it. Empty if the user may not use
+             the admin at all.
+    :rtype: an ordered dictionary, keyed by object.
+    :raises: :exc:`ValueError` for unknown views.
+    """
+    return _links_for(request, objects, views, admin_site, query,
+                      _resolve_admin_link)
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+from django.apps import AppConfig
+
+
+class AdminlinksConfig(AppConfig):
+    """
+    Connects the signals which keep any cached permission snapshots up to
+    date, once every model is loaded.
+
+    .. versionadded:: 0.9.0
+    """
+    name = 'adminlinks'
+    verbose_name = 'Admin links'
+
+    def ready(self):
+        from adminlinks.permissions import connect_receivers
+        connect_receivers()
@@ -13,9 +13,79 @@ MODELADMIN_REVERSE = '%(namespace)s:%(app)s_%(module)s_%(view)s'
 #: .. seealso:: :func:`~adminlinks.templatetags.utils.get_registered_modeladmins`
 PERMISSION_ATTRIBUTE = 'has_%s_permission'
 
+#: The permission each view of a single object needs, which is passed as the
+#: ``action`` to
+#: :meth:`~adminlinks.admin.AdminlinksMixin.get_permitted_objects`
+#:
+#: .. versionadded:: 0.9.0
+OBJECT_PERMISSIONS = {
+    'change': 'change',
+    'change_field': 'change',
+    'delete': 'delete',
+    'history': 'change',
+}
+
 #: querystring key for tracking changes which might not otherwise be broadcast
 #: by a success template being rendered.
 DATA_CHANGED = '_data_changed'
 
 #: querystring key for figuring out if we want to close a popup.
 AUTOCLOSING = '_autoclose'
+
+#: Template tags render their links as usual.
+HTML_OUTPUT = 'html'
+
+#: Template tags render an inert placeholder, which is the same for everyone,
+#: and is replaced by the links from the browser.
+#:
+#: .. seealso:: :mod:`~adminlinks.placeholders`
+PLACEHOLDER_OUTPUT = 'placeholder'
+
+#: Template tags render an ``<esi:include>``, for a proxy to fill in.
+#:
+#: .. seealso:: :mod:`~adminlinks.placeholders`
+ESI_OUTPUT = 'esi'
+
+#: context key which may be used to override ``settings.ADMINLINKS_OUTPUT_MODE``
+#: for a single template.
+OUTPUT_MODE_CONTEXT_KEY = 'adminlinks_output_mode'
+
+#: cookie set by :class:`~adminlinks.admin.AdminlinksSiteMixin` for users who
+#: may see links, so that the bundled JavaScript only asks for placeholders to
+#: be filled in for them.
+#:
+#: .. versionadded:: 0.9.0
+EDITOR_COOKIE = 'django-adminlinks-editor'
+
+#: The static files combined into
+#: :data:`~adminlinks.constants.BUNDLE_JS_NAME` by the ``adminlinks_bundle``
+#: management command, in the order ``adminlinks/js.html`` loads them.
+#:
+#: .. versionadded:: 0.9.0
+BUNDLE_JS = (
+    'admin/js/jquery.min.js',
+    'adminlinks/js/jquery.fancyiframe.js',
+    'adminlinks/js/adminlinks.js',
+)
+
+#: The static files combined into
+#: :data:`~adminlinks.constants.BUNDLE_CSS_NAME`, in the order
+#: ``adminlinks/css.html`` loads them.
+#:
+#: .. versionadded:: 0.9.0
+BUNDLE_CSS = (
+    'adminlinks/css/widgets.css',
+    'adminlinks/css/fancyiframe-custom.css',
+)
+
+#: Where the combined JavaScript is written, relative to the static root;
+#: used instead of the separate files when ``ADMINLINKS_BUNDLE`` is set.
+#:
+#: .. versionadded:: 0.9.0
+BUNDLE_JS_NAME = 'adminlinks/js/bundle.min.js'
+
+#: Where the combined stylesheets are written. Kept next to the originals, so
+#: any relative ``url()`` still works.
+#:
+#: .. versionadded:: 0.9.0
+BUNDLE_CSS_NAME = 'adminlinks/css/bundle.min.css'
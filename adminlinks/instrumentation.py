@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from collections import defaultdict
+from contextlib import contextmanager
+import threading
+from timeit import default_timer
+from django.dispatch import Signal
+
+_state = threading.local()
+
+#: Sent with the :class:`~adminlinks.instrumentation.Stats` gathered for a
+#: request, by :class:`~adminlinks.middleware.InstrumentationMiddleware`, or
+#: at the end of :func:`~adminlinks.instrumentation.collect`.
+stats_collected = Signal(providing_args=['request', 'stats'])
+
+
+class Stats(object):
+    """
+    Counters and timings for the work done by `django-adminlinks`, while
+    collecting. The names in use are:
+
+    * ``reverse``: calls to :func:`~django.core.urlresolvers.reverse`
+    * ``permissions``: calls to the
+      :class:`~django.contrib.admin.ModelAdmin` ``has_*_permission`` methods
+    * ``registry_walks``: iterations over the
+      :class:`~django.contrib.admin.AdminSite` registry
+    * ``get_admin_site``: calls to
+      :func:`~adminlinks.templatetags.utils.get_admin_site`
+    * ``tags``: every template tag rendered, and ``tag.<ClassName>`` for each
+      class of template tag.
+
+    .. versionadded:: 0.9.0
+    """
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.timings = defaultdict(float)
+
+    def incr(self, name, amount=1):
+        self.counts[name] += amount
+
+    def add_time(self, name, seconds):
+        self.counts[name] += 1
+        self.timings[name] += seconds
+
+    def as_dict(self):
+        """
+        :return: each name, with its ``count`` and ``time`` (in seconds; always
+                 0 for plain counters)
+        :rtype: dictionary
+        """
+        return dict((name, {'count': count,
+                            'time': self.timings.get(name, 0.0)})
+                    for name, count in self.counts.items())
+
+
+def get_stats():
+    """
+    :return: the statistics currently being collected for this thread.
+    :rtype: :class:`~adminlinks.instrumentation.Stats` or :data:`None`
+    """
+    return getattr(_state, 'stats', None)
+
+
+def start_collecting():
+    """
+    Begins collecting statistics for this thread, unless already doing so.
+
+    :rtype: :class:`~adminlinks.instrumentation.Stats`
+    """
+    stats = get_stats()
+    if stats is None:
+        stats = _state.stats = Stats()
+    return stats
+
+
+def stop_collecting():
+    """
+    :return: everything collected since
+             :func:`~adminlinks.instrumentation.start_collecting`
+    :rtype: :class:`~adminlinks.instrumentation.Stats` or :data:`None`
+    """
+    stats = get_stats()
+    _state.stats = None
+    return stats
+
+
+@contextmanager
+def collect(request=None):
+    """
+    Collects statistics for the duration of a ``with`` block, outside of the
+    request/response cycle::
+
+        with collect() as stats:
+            template.render(context)
+        print(stats.as_dict())
+
+    .. versionadded:: 0.9.0
+    """
+    previous = get_stats()
+    stats = _state.stats = Stats()
+    try:
+        yield stats
+    finally:
+        _state.stats = previous
+        stats_collected.send(sender=Stats, request=request, stats=stats)
+
+
+def incr(name, amount=1):
+    """
+    Increments a counter, if anything is being collected. Otherwise costs
+    one attribute lookup.
+    """
+    stats = getattr(_state, 'stats', None)
+    if stats is not None:
+        stats.incr(name, amount)
+
+
+class timer(object):
+    """
+    Context manager which counts and times the wrapped block, if anything is
+    being collected::
+
+        with timer('reverse'):
+            url = reverse(...)
+    """
+    __slots__ = ('name', 'stats', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.stats = getattr(_state, 'stats', None)
+        if self.stats is not None:
+            self.started = default_timer()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.stats is not None:
+            self.stats.add_time(self.name, default_timer() - self.started)
+        return False
+
+
+class InstrumentedTag(object):
+    """
+    Mixin for :class:`~classytags.core.Tag` subclasses, timing every render
+    under ``tags`` and ``tag.<ClassName>``, including resolving the arguments.
+    """
+    def render(self, context):
+        stats = getattr(_state, 'stats', None)
+        if stats is None:
+            return super(InstrumentedTag, self).render(context)
+        started = default_timer()
+        try:
+            return super(InstrumentedTag, self).render(context)
+        finally:
+            elapsed = default_timer() - started
+            stats.add_time('tags', elapsed)
+            stats.add_time('tag.%s' % self.__class__.__name__, elapsed)
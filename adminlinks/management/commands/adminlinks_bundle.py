@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import codecs
+from optparse import make_option
+import os
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from adminlinks.constants import (BUNDLE_JS, BUNDLE_CSS, BUNDLE_JS_NAME,
+                                  BUNDLE_CSS_NAME)
+try:
+    from rjsmin import jsmin
+except ImportError:  # optional
+    jsmin = None
+try:
+    from rcssmin import cssmin
+except ImportError:  # optional
+    cssmin = None
+
+def minify_js(source):
+    """
+    Uses `rjsmin`_ if it is installed; otherwise the script is left as it is,
+    because anything cleverer risks breaking it.
+
+    .. _rjsmin: https://pypi.python.org/pypi/rjsmin
+    """
+    if jsmin is not None:
+        return jsmin(source)
+    return source.strip()
+
+
+def minify_css(source):
+    """
+    Uses `rcssmin`_ if it is installed; otherwise the stylesheet is left as
+    it is, because comment markers may also appear in strings and ``url()``.
+
+    .. _rcssmin: https://pypi.python.org/pypi/rcssmin
+    """
+    if cssmin is not None:
+        return cssmin(source)
+    return source.strip()
+
+
+class Command(BaseCommand):
+    """
+    Combines the JavaScript and stylesheets rendered by
+    ``{% render_adminlinks_js %}`` and ``{% render_adminlinks_css %}`` into
+    one file each, which are used instead when ``ADMINLINKS_BUNDLE`` is set::
+
+        python manage.py adminlinks_bundle
+        python manage.py collectstatic
+
+    The files are written to the first of ``STATICFILES_DIRS``, unless
+    ``--output`` is given, and given content-hashed names by
+    ``collectstatic`` if ``STATICFILES_STORAGE`` is a
+    ``CachedStaticFilesStorage`` (or ``ManifestStaticFilesStorage``).
+
+    .. versionadded:: 0.9.0
+    """
+    help = ('Combines and minifies the JavaScript and CSS for '
+            'render_adminlinks_js and render_adminlinks_css.')
+    option_list = BaseCommand.option_list + (
+        make_option('--output', dest='output', default=None,
+                    help='Directory to write the bundles to. Defaults to '
+                         'the first of STATICFILES_DIRS.'),
+    )
+
+    def get_output_dir(self, output=None):
+        if output:
+            return output
+        for directory in getattr(settings, 'STATICFILES_DIRS', ()):
+            # (prefix, path) pairs would change the bundle's url.
+            if not isinstance(directory, (list, tuple)):
+                return directory
+        raise CommandError('Add a directory to STATICFILES_DIRS, or use '
+                           '--output to say where to write the bundles.')
+
+    def handle(self, *args, **options):
+        output = self.get_output_dir(options.get('output'))
+        bundles = ((BUNDLE_JS_NAME, BUNDLE_JS, minify_js, ';\n'),
+                   (BUNDLE_CSS_NAME, BUNDLE_CSS, minify_css, '\n'))
+        for name, sources, minify, separator in bundles:
+            parts = []
+            for source in sources:
+                path = finders.find(source)
+                if path is None:
+                    raise CommandError('Could not find %s' % source)
+                with codecs.open(path, 'r', 'utf-8') as f:
+                    parts.append(minify(f.read()))
+            destination = os.path.join(output, *name.split('/'))
+            if not os.path.isdir(os.path.dirname(destination)):
+                os.makedirs(os.path.dirname(destination))
+            content = separator.join(parts) + '\n'
+            with codecs.open(destination, 'w', 'utf-8') as f:
+                f.write(content)
+            self.stdout.write('Wrote %s (%d bytes, from %d files)\n' % (
+                destination, len(content.encode('utf-8')), len(sources)))
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+import logging
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from adminlinks.instrumentation import (get_stats, start_collecting,
+                                        stop_collecting, stats_collected)
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentationMiddleware(object):
+    """
+    Collects :class:`~adminlinks.instrumentation.Stats` for every request,
+    if ``settings.ADMINLINKS_INSTRUMENTATION`` is :data:`True`. Put it as near
+    the top of ``MIDDLEWARE_CLASSES`` as possible::
+
+        MIDDLEWARE_CLASSES = (
+            'adminlinks.middleware.InstrumentationMiddleware',
+            # ...
+        )
+
+    Once the response is ready, the statistics are available as
+    ``request.adminlinks_stats``, and are sent along with the
+    :data:`~adminlinks.instrumentation.stats_collected` signal.
+
+    .. versionadded:: 0.9.0
+    """
+    def process_request(self, request):
+        if getattr(settings, 'ADMINLINKS_INSTRUMENTATION', False):
+            request.adminlinks_stats = start_collecting()
+        return None
+
+    def process_response(self, request, response):
+        stats = getattr(request, 'adminlinks_stats', None)
+        if stats is not None:
+            stop_collecting()
+            logger.debug('adminlinks stats for %s: %r', request.path,
+                         stats.as_dict())
+            stats_collected.send(sender=self.__class__, request=request,
+                                 stats=stats)
+        return response
+
+
+class ServerTimingMiddleware(object):
+    """
+    Adds a `Server-Timing`_ header to responses for staff members, with the
+    time spent
+    rendering the `django-adminlinks` template tags (from
+    :meth:`~adminlinks.templatetags.adminlinks_buttons.BaseAdminLink.get_context`
+    or :meth:`~adminlinks.templatetags.adminlinks_toolbar.AdminlinksToolbar.get_context`
+    to the rendered output), and within those, how much was spent checking
+    permissions and reversing urls::
+
+        Server-Timing: adminlinks-tags;dur=1.532;desc="adminlinks tags (4)", ...
+
+    Browser developer tools display these alongside the request, and they may
+    be logged by whatever is in front of Django.
+
+    Nothing is collected unless ``settings.ADMINLINKS_SERVER_TIMING`` is
+    :data:`True`, and then only for the users
+    :meth:`~adminlinks.middleware.ServerTimingMiddleware.should_report` allows,
+    so it must come after ``AuthenticationMiddleware`` in
+    ``MIDDLEWARE_CLASSES``. May be used with or without
+    :class:`~adminlinks.middleware.InstrumentationMiddleware`.
+
+    .. _Server-Timing: https://www.w3.org/TR/server-timing/
+
+    .. versionadded:: 0.9.0
+    """
+    #: the names from :class:`~adminlinks.instrumentation.Stats` to report,
+    #: and the metric name to report each as.
+    metrics = (
+        ('tags', 'adminlinks-tags', 'adminlinks tags'),
+        ('permissions', 'adminlinks-permissions', 'adminlinks permissions'),
+        ('reverse', 'adminlinks-reverse', 'adminlinks reverse'),
+    )
+
+    def should_report(self, request):
+        """
+        The timings say something about how the site works, so by default
+        they're only given to active staff members.
+
+        :return: whether to collect and report the timings for `request`.
+        """
+        if not getattr(settings, 'ADMINLINKS_SERVER_TIMING', False):
+            return False
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_active and user.is_staff
+
+    def process_request(self, request):
+        if self.should_report(request):
+            request._adminlinks_server_timing = start_collecting()
+        return None
+
+    def get_header(self, stats):
+        """
+        :return: the `Server-Timing` value for the collected ``stats``, or an
+                 empty string if nothing was done.
+        """
+        entries = []
+        for name, metric, description in self.metrics:
+            count = stats.counts.get(name, 0)
+            if count:
+                entries.append('%s;dur=%.3f;desc="%s (%d)"' % (
+                    metric, stats.timings.get(name, 0.0) * 1000,
+                    description, count))
+        return ', '.join(entries)
+
+    def process_response(self, request, response):
+        stats = getattr(request, '_adminlinks_server_timing', None)
+        if stats is None:
+            return response
+        if get_stats() is stats:
+            stop_collecting()
+        value = self.get_header(stats)
+        if value:
+            if response.has_header('Server-Timing'):
+                value = '%s, %s' % (response['Server-Timing'], value)
+            response['Server-Timing'] = value
+        return response
+
+
+class PreloadMiddleware(object):
+    """
+    Adds a ``Link`` header to HTML responses, asking the browser to preload
+    the scripts and stylesheets rendered by ``{% render_adminlinks_js %}``
+    and ``{% render_adminlinks_css %}``, before it has even read the page::
+
+        Link: </static/adminlinks/css/widgets.css>; rel=preload; as=style, ...
+
+    Only successful responses for users who would see the links (see
+    :func:`~adminlinks.templatetags.utils.context_passes_test`) get the
+    header, so it must come after ``AuthenticationMiddleware`` in
+    ``MIDDLEWARE_CLASSES``. With ``DEBUG`` on, for ``INTERNAL_IPS``, the
+    separate files aren't preloaded, as the templates add a query string to
+    them which changes every time.
+
+    Some servers and CDNs turn these headers into a ``103 Early Hints``
+    response, sent while the page is still being generated; Django can't
+    send that itself.
+
+    .. versionadded:: 0.9.0
+    """
+    def process_response(self, request, response):
+        if not response.get('Content-Type', '').startswith('text/html'):
+            return response
+        # redirects (such as for APPEND_SLASH) and errors may be returned
+        # before AuthenticationMiddleware has seen the request.
+        if not 200 <= response.status_code < 300 or not hasattr(request, 'user'):
+            return response
+        from adminlinks.templatetags.utils import context_passes_test
+        patch_vary_headers(response, ('Cookie',))
+        if not context_passes_test({'request': request}):
+            return response
+        from adminlinks.templatetags.adminlinks_assets import get_asset_urls
+        # the same as django.core.context_processors.debug
+        debug = (settings.DEBUG and
+                 request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS)
+        assets = get_asset_urls(debug=debug)
+        if not assets:
+            return response
+        value = ', '.join('<%s>; rel=preload; as=%s' % (url, kind)
+                          for url, kind in assets)
+        if response.has_header('Link'):
+            value = '%s, %s' % (response['Link'], value)
+        response['Link'] = value
+        return response
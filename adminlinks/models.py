@@ -1 +1,9 @@
-# intentionally left blank
\ No newline at end of file
+# -*- coding: utf-8 -*-
+# intentionally left blank, except for connecting the signals which keep any
+# cached permission snapshots up to date, on versions of Django without
+# AppConfig.ready() (see adminlinks.apps).
+try:
+    from django.apps import AppConfig  # noqa
+except ImportError:  # < Django 1.7
+    from adminlinks.permissions import connect_receivers
+    connect_receivers()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from django.utils.translation import ugettext_lazy as _
+from adminlinks.instrumentation import start_collecting, stop_collecting
+try:
+    from debug_toolbar.panels import Panel
+except ImportError:  # django-debug-toolbar isn't installed, or is < 1.0
+    class Panel(object):
+        """
+        Just enough of :class:`debug_toolbar.panels.Panel` for
+        :class:`~adminlinks.panels.AdminlinksPanel` to be used (and tested)
+        without django-debug-toolbar.
+        """
+        def __init__(self, toolbar=None):
+            self.toolbar = toolbar
+            self._stats = {}
+
+        def record_stats(self, stats):
+            self._stats.update(stats)
+
+        def get_stats(self):
+            return self._stats
+
+
+class AdminlinksPanel(Panel):
+    """
+    A panel for `django-debug-toolbar`_, showing how often the template tags
+    reversed urls, checked permissions and walked the
+    :class:`~django.contrib.admin.AdminSite` registry, and how long each tag
+    took to render::
+
+        DEBUG_TOOLBAR_PANELS = (
+            # ...
+            'adminlinks.panels.AdminlinksPanel',
+        )
+
+    .. _django-debug-toolbar: https://github.com/django-debug-toolbar/django-debug-toolbar
+
+    .. versionadded:: 0.9.0
+    """
+    title = _('Adminlinks')
+    nav_title = _('Adminlinks')
+    template = 'adminlinks/debug_toolbar_panel.html'
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        return _('%(tags)d tags, %(reverse)d reversed') % {
+            'tags': stats.get('tag_count', 0),
+            'reverse': stats.get('reverse_count', 0),
+        }
+
+    def enable_instrumentation(self):
+        start_collecting()
+
+    def disable_instrumentation(self):
+        stop_collecting()
+
+    def process_response(self, request, response):
+        # InstrumentationMiddleware may have got to them first.
+        stats = getattr(request, 'adminlinks_stats', None)
+        if stats is None:
+            stats = stop_collecting()
+        counters = []
+        tags = []
+        if stats is not None:
+            for name, values in sorted(stats.as_dict().items()):
+                row = (name, values['count'], values['time'] * 1000)
+                if name.startswith('tag.'):
+                    tags.append(row)
+                else:
+                    counters.append(row)
+        self.record_stats({
+            'counters': counters,
+            'tags': tags,
+            'tag_count': stats.counts['tags'] if stats is not None else 0,
+            'reverse_count': stats.counts['reverse'] if stats is not None else 0,
+        })
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import logging
+from time import time
+from uuid import uuid4
+from django.conf import settings
+try:
+    from django.core.cache import caches
+
+    def get_cache(alias):
+        return caches[alias]
+except ImportError:  # < Django 1.7
+    from django.core.cache import get_cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+#: cache key holding the current permissions version; any snapshot stored
+#: under a different version is ignored.
+VERSION_KEY = 'adminlinks:permissions:version'
+
+#: cache key for an individual user's snapshot.
+SNAPSHOT_KEY = 'adminlinks:permissions:%s'
+
+#: cache key added by the one request which gets to refresh a stale snapshot.
+REFRESHING_KEY = 'adminlinks:permissions:%s:refreshing'
+
+# about as long as memcached will accept as a relative timeout.
+_VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+class PermissionSnapshot(object):
+    """
+    The permissions of a :class:`~django.contrib.auth.models.User`, as returned
+    by :meth:`~django.contrib.auth.models.User.get_all_permissions`, frozen at
+    the point they were last checked.
+
+    Answers the same questions as the default
+    :class:`~django.contrib.auth.backends.ModelBackend` would, without needing
+    to go to the database.
+
+    .. versionadded:: 0.9.0
+    """
+    def __init__(self, permissions):
+        self.permissions = frozenset(permissions)
+        self.app_labels = frozenset(perm[:perm.index('.')]
+                                    for perm in self.permissions)
+
+    def __len__(self):
+        return len(self.permissions)
+
+    def has_module_perms(self, user, app_label):
+        if not user.is_active:
+            return False
+        return user.is_superuser or app_label in self.app_labels
+
+
+def get_permissions_cache():
+    """
+    Permission snapshots are only used if
+    ``settings.ADMINLINKS_PERMISSION_CACHE`` names one of the project's
+    ``CACHES``.
+
+    .. versionadded:: 0.9.0
+
+    :return: the cache to use, or :data:`None` if snapshots are disabled.
+    """
+    alias = getattr(settings, 'ADMINLINKS_PERMISSION_CACHE', None)
+    if alias is None:
+        return None
+    return get_cache(alias)
+
+
+def get_permissions_version(cache):
+    """
+    :return: the current permissions version, which changes whenever
+             :func:`~adminlinks.permissions.bump_permissions_version` is called.
+    :rtype: string, or :data:`None` if the cache isn't storing anything.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid4().hex, _VERSION_TIMEOUT)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_permissions_version(*args, **kwargs):
+    """
+    Invalidates every stored
+    :class:`~adminlinks.permissions.PermissionSnapshot`, by moving the
+    permissions version on. Connected to the signals which indicate users
+    or groups have gained or lost permissions, and may be called directly
+    if permissions are changed by other means.
+
+    .. versionadded:: 0.9.0
+    """
+    cache = get_permissions_cache()
+    if cache is not None:
+        logger.debug('Permissions changed, invalidating all snapshots')
+        cache.set(VERSION_KEY, uuid4().hex, _VERSION_TIMEOUT)
+
+
+def _load_snapshot(user, cache):
+    timeout = getattr(settings, 'ADMINLINKS_PERMISSION_CACHE_TIMEOUT', 300)
+    stale = getattr(settings, 'ADMINLINKS_PERMISSION_CACHE_STALE', 60)
+    snapshot_key = SNAPSHOT_KEY % user.pk
+    version = get_permissions_version(cache)
+    stored = cache.get(snapshot_key)
+    now = time()
+
+    refreshing = False
+
+    if stored is not None:
+        stored_version, fresh_until, is_superuser, permissions = stored
+        if stored_version == version and is_superuser == user.is_superuser:
+            if now < fresh_until:
+                return PermissionSnapshot(permissions)
+            # stale, but usable: only one request gets to refresh it, and
+            # everyone else keeps using the old value in the meantime.
+            refreshing = cache.add(REFRESHING_KEY % user.pk, 1, stale)
+            if not refreshing:
+                logger.debug('Serving stale permissions for %r' % user)
+                return PermissionSnapshot(permissions)
+
+    permissions = frozenset(user.get_all_permissions())
+    cache.set(snapshot_key, (version, now + timeout, user.is_superuser,
+                             permissions), timeout + stale)
+    # only the request which added the key may remove it, otherwise another
+    # request might start refreshing while the first still is.
+    if refreshing:
+        cache.delete(REFRESHING_KEY % user.pk)
+    return PermissionSnapshot(permissions)
+
+
+def get_permission_snapshot(user):
+    """
+    Finds the :class:`~adminlinks.permissions.PermissionSnapshot` for the
+    given user, from the permissions cache (see
+    :func:`~adminlinks.permissions.get_permissions_cache`) if possible.
+
+    Once stale (older than ``ADMINLINKS_PERMISSION_CACHE_TIMEOUT`` seconds), a
+    snapshot may still be used for another ``ADMINLINKS_PERMISSION_CACHE_STALE``
+    seconds, while a single request fetches the new permissions.
+
+    The snapshot is also used to populate the permission cache that
+    :class:`~django.contrib.auth.backends.ModelBackend` keeps on the user, so
+    any subsequent calls to
+    :meth:`~django.contrib.auth.models.User.has_perm` for the request
+    don't query the database either.
+
+    .. versionadded:: 0.9.0
+
+    :param user: the :class:`~django.contrib.auth.models.User` from the request.
+    :return: the user's permissions, or :data:`None` if the user is anonymous
+             or snapshots are disabled.
+    :rtype: :class:`~adminlinks.permissions.PermissionSnapshot` or :data:`None`
+    """
+    snapshot = getattr(user, '_adminlinks_permissions', None)
+    if snapshot is not None:
+        return snapshot
+    if not user.is_authenticated():
+        return None
+    cache = get_permissions_cache()
+    if cache is None:
+        return None
+    snapshot = _load_snapshot(user, cache)
+    user._adminlinks_permissions = snapshot
+    if not hasattr(user, '_perm_cache'):
+        user._perm_cache = set(snapshot.permissions)
+    return snapshot
+
+
+def connect_receivers():
+    """
+    Connects :func:`~adminlinks.permissions.bump_permissions_version` to the
+    signals sent when permissions change. Called once the models are ready,
+    by :class:`~adminlinks.apps.AdminlinksConfig` (or, before Django 1.7,
+    when ``adminlinks.models`` is imported).
+
+    .. versionadded:: 0.9.0
+    """
+    from django.contrib.auth.models import Group, Permission
+    try:
+        from django.contrib.auth import get_user_model
+    except ImportError:  # < Django 1.5
+        from django.contrib.auth.models import User as UserModel
+    else:
+        UserModel = get_user_model()
+    for name in ('user_permissions', 'groups'):
+        field = getattr(UserModel, name, None)
+        if field is not None:
+            m2m_changed.connect(bump_permissions_version, sender=field.through,
+                                dispatch_uid='adminlinks_%s' % name)
+    m2m_changed.connect(bump_permissions_version,
+                        sender=Group.permissions.through,
+                        dispatch_uid='adminlinks_group_permissions')
+    post_delete.connect(bump_permissions_version, sender=Group,
+                        dispatch_uid='adminlinks_group_deleted')
+    post_save.connect(bump_permissions_version, sender=Permission,
+                      dispatch_uid='adminlinks_permission_saved')
+    post_delete.connect(bump_permissions_version, sender=Permission,
+                        dispatch_uid='adminlinks_permission_deleted')
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Placeholders allow the same HTML to be served to everyone, so that pages
+using the template tags may be cached by a shared cache or CDN. Set::
+
+    ADMINLINKS_OUTPUT_MODE = 'placeholder'
+
+or put ``adminlinks_output_mode`` into the context of a single template, and
+each tag renders an empty element describing itself, instead of its links.
+The :ref:`bundled JavaScript <bundled_js>` then posts every placeholder on the
+page to the admin site in a single request, and replaces them with whatever
+the current user may actually see.
+
+Alternatively, behind `Varnish`_ or another proxy which supports
+`Edge Side Includes`_, set the output mode to ``'esi'`` and each tag renders
+an ``<esi:include>`` for a fragment of the admin site instead, which the
+proxy fetches for each user.
+
+.. _Varnish: https://www.varnish-cache.org/
+.. _Edge Side Includes: http://www.w3.org/TR/esi-lang
+
+.. versionadded:: 0.9.0
+"""
+from __future__ import unicode_literals
+from collections import defaultdict
+import json
+import logging
+try:
+    from urllib import urlencode
+except ImportError:  # Python 3
+    from urllib.parse import urlencode
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models.fields import FieldDoesNotExist
+from django.template import Context, Template
+from django.template.loader import render_to_string
+try:
+    from django.utils.encoding import force_text
+except ImportError:  # < Django 1.5
+    from django.utils.encoding import force_unicode as force_text
+try:
+    from django.utils.six import string_types
+except ImportError:  # < Django 1.4.2
+    string_types = (basestring,)
+from adminlinks.constants import (HTML_OUTPUT, PLACEHOLDER_OUTPUT, ESI_OUTPUT,
+                                  OUTPUT_MODE_CONTEXT_KEY)
+from adminlinks.templatetags.utils import (context_passes_test, get_admin_site,
+                                           get_modeladmin_index,
+                                           _resolve_admin_link)
+
+logger = logging.getLogger(__name__)
+
+_placeholder_tags = {}
+_placeholder_templates = {}
+
+
+def get_output_mode(context):
+    """
+    :param context: a :class:`~django.template.Context`, which may contain
+                    ``adminlinks_output_mode``.
+    :return: the output mode for the template tags; otherwise
+             ``settings.ADMINLINKS_OUTPUT_MODE``, defaulting to **"html"**
+    :rtype: string
+    """
+    mode = None
+    if context is not None and OUTPUT_MODE_CONTEXT_KEY in context:
+        mode = context[OUTPUT_MODE_CONTEXT_KEY]
+    return mode or getattr(settings, 'ADMINLINKS_OUTPUT_MODE', HTML_OUTPUT)
+
+
+def get_placeholder_endpoint(admin_site, urlname='adminlinks_placeholders'):
+    """
+    :param admin_site: name of the admin site.
+    :param urlname: the view on the admin site; either
+                    **"adminlinks_placeholders"** or **"adminlinks_fragment"**
+    :return: the url of the view, or an empty string if the site doesn't use
+             :class:`~adminlinks.admin.AdminlinksSiteMixin`.
+    :rtype: unicode string
+    """
+    site = get_admin_site(admin_site)
+    if site is None:
+        return ''
+    return _resolve_admin_link('%s:%s' % (site.name, urlname))
+
+
+class PlaceholderTag(object):
+    """
+    Mixin for :class:`~classytags.helpers.InclusionTag` subclasses, which
+    renders :attr:`~adminlinks.placeholders.PlaceholderTag.placeholder_template`
+    instead of the tag, when the output mode is **"placeholder"**, or
+    :attr:`~adminlinks.placeholders.PlaceholderTag.esi_template` when it is
+    **"esi"**.
+
+    The tag must have a :attr:`~classytags.core.Tag.name` matching the name it
+    is registered under.
+    """
+    #: the template for the placeholder.
+    placeholder_template = 'adminlinks/placeholder.html'
+
+    #: the template for the ``<esi:include>``
+    esi_template = 'adminlinks/esi.html'
+
+    #: which template tag library the tag is in; tags without one are never
+    #: rendered as placeholders.
+    placeholder_library = None
+
+    #: the tag's arguments, in order. ``obj`` is always a
+    #: :class:`~django.db.models.Model` (or instance), everything else must be
+    #: a string, boolean or number.
+    placeholder_arguments = ()
+
+    #: whether ``obj`` needs to be fetched from the database when the
+    #: placeholder is replaced, or whether the model class will do.
+    placeholder_needs_instance = True
+
+    def wants_placeholder(self, context, **kwargs):
+        return (self.placeholder_library is not None
+                and get_output_mode(context) in (PLACEHOLDER_OUTPUT,
+                                                 ESI_OUTPUT))
+
+    def render_tag(self, context, **kwargs):
+        if self.wants_placeholder(context, **kwargs):
+            if get_output_mode(context) == ESI_OUTPUT:
+                data = self.get_placeholder_context(
+                    context, urlname='adminlinks_fragment', **kwargs)
+                return render_to_string(self.esi_template, data)
+            data = self.get_placeholder_context(context, **kwargs)
+            return render_to_string(self.placeholder_template, data)
+        return super(PlaceholderTag, self).render_tag(context, **kwargs)
+
+    def get_placeholder_context(self, context, urlname='adminlinks_placeholders',
+                                **kwargs):
+        """
+        :param urlname: the view on the admin site which will render the tag.
+        :return: a ``placeholder`` with everything needed to render the tag
+                 again later, and the ``src`` of the fragment for the tag, or
+                 an empty dictionary if nothing can be rendered.
+        :rtype: dictionary.
+        """
+        placeholder = {'tag': self.name, 'model': '', 'pk': ''}
+        arguments = {}
+        for name in self.placeholder_arguments:
+            value = kwargs.get(name)
+            if name == 'obj':
+                opts = getattr(value, '_meta', None)
+                if opts is None:
+                    logger.debug('Object has no _meta attribute')
+                    return {}
+                placeholder['model'] = '%s.%s' % (opts.app_label,
+                                                  opts.object_name.lower())
+                if (self.placeholder_needs_instance
+                        and not isinstance(value, type)):
+                    placeholder['pk'] = force_text(value.pk)
+                continue
+            if value is not None and not isinstance(value, (bool, int, float)):
+                value = force_text(value)
+            arguments[name] = value
+
+        endpoint = get_placeholder_endpoint(arguments.get('admin_site',
+                                                          'admin'), urlname)
+        if not endpoint:
+            logger.debug('No placeholder endpoint for the admin site')
+            if settings.DEBUG:
+                raise ImproperlyConfigured("To use placeholders, your AdminSite "
+                                           "needs to use "
+                                           "`adminlinks.admin.AdminlinksSiteMixin`")
+            return {}
+        placeholder.update(endpoint=endpoint, arguments=json.dumps(arguments))
+        query = [(key, placeholder[key])
+                 for key in ('tag', 'model', 'pk', 'arguments')
+                 if placeholder[key]]
+        placeholder['src'] = '%s?%s' % (endpoint, urlencode(
+            [(key, value.encode('utf-8')) for key, value in query]))
+        return {'placeholder': placeholder}
+
+    @classmethod
+    def get_placeholder_source(cls, arguments):
+        """
+        :return: the template source which renders the tag, given a context
+                 containing ``obj`` and each of the ``arguments``.
+        """
+        return '{%% load %s %%}{%% %s %s %%}' % (
+            cls.placeholder_library, cls.name,
+            ' '.join(cls.placeholder_arguments))
+
+
+def get_placeholder_tags():
+    """
+    :return: every tag which may be rendered as a placeholder, by name.
+    :rtype: dictionary.
+    """
+    if not _placeholder_tags:
+        from adminlinks.templatetags import (adminlinks_buttons,
+                                             adminlinks_toolbar)
+        for library in (adminlinks_buttons, adminlinks_toolbar):
+            for name, tag in library.register.tags.items():
+                if (isinstance(tag, type) and issubclass(tag, PlaceholderTag)
+                        and tag.placeholder_library is not None):
+                    _placeholder_tags[name] = tag
+    return _placeholder_tags
+
+
+def _get_placeholder_template(tag, arguments):
+    source = tag.get_placeholder_source(arguments)
+    if source not in _placeholder_templates:
+        _placeholder_templates[source] = Template(source)
+    return _placeholder_templates[source]
+
+
+def _parse_placeholder(item, tags, index, admin_site):
+    """
+    Checks a placeholder sent by the browser is something which could have been
+    rendered for this admin site, including that any ``fieldname`` exists on
+    the model.
+
+    :return: the placeholder's id, tag, model, primary key and arguments, or
+             :data:`None`
+    """
+    if not isinstance(item, dict):
+        return None
+    tag = tags.get(item.get('tag'))
+    arguments = item.get('arguments')
+    if tag is None or not isinstance(arguments, dict):
+        return None
+    for name in tag.placeholder_arguments:
+        if name == 'obj':
+            continue
+        value = arguments.get(name)
+        if value is not None and not isinstance(value, string_types + (bool, int,
+                                                                  float)):
+            return None
+        arguments[name] = value
+    if arguments.get('admin_site', admin_site.name) != admin_site.name:
+        return None
+    model = pk = None
+    if 'obj' in tag.placeholder_arguments:
+        app_label, _, model_name = force_text(item.get('model', '')).partition('.')
+        entry = index.registry.get((app_label, model_name))
+        if entry is None:
+            return None
+        model = entry[0]
+        if tag.placeholder_needs_instance and item.get('pk'):
+            try:
+                pk = model._meta.pk.to_python(item['pk'])
+            except ValidationError:
+                return None
+        if 'fieldname' in tag.placeholder_arguments:
+            try:
+                model._meta.get_field(arguments['fieldname'])
+            except FieldDoesNotExist:
+                return None
+    return (force_text(item.get('id')), tag, model, pk,
+            dict((name, arguments[name]) for name in tag.placeholder_arguments
+                 if name != 'obj'))
+
+
+def render_placeholders(request, admin_site, placeholders):
+    """
+    Renders the template tags described by each placeholder, for the current
+    user. Only the tags which support placeholders, and models registered to
+    `admin_site`, are rendered; anything else is ignored.
+
+    Instances are fetched with one query per model, from the
+    :class:`~django.contrib.admin.ModelAdmin`'s queryset, so objects it
+    doesn't show get no links.
+
+    :param request: the :class:`~django.http.HttpRequest` from the browser.
+    :param admin_site: the :class:`~django.contrib.admin.AdminSite` the
+                       placeholders were sent to.
+    :param placeholders: a list of dictionaries, each with an ``id``, ``tag``,
+                         ``model``, ``pk`` and the tag's ``arguments``.
+    :return: the HTML for each placeholder, keyed by ``id``.
+    :rtype: dictionary.
+    """
+    if not context_passes_test({'request': request}):
+        return {}
+    tags = get_placeholder_tags()
+    index = get_modeladmin_index(request, admin_site)
+    parsed = [_parse_placeholder(item, tags, index, admin_site)
+              for item in placeholders]
+    parsed = [item for item in parsed if item is not None]
+
+    wanted = defaultdict(set)
+    for ident, tag, model, pk, arguments in parsed:
+        if pk is not None:
+            wanted[model].add(pk)
+    instances = {}
+    for model, pks in wanted.items():
+        # only objects the ModelAdmin would show are linked to.
+        model_admin = admin_site._registry[model]
+        if hasattr(model_admin, 'get_queryset'):
+            queryset = model_admin.get_queryset(request)
+        else:  # < Django 1.6
+            queryset = model_admin.queryset(request)
+        for pk, obj in queryset.in_bulk(list(pks)).items():
+            instances[(model, pk)] = obj
+
+    output = {}
+    for ident, tag, model, pk, arguments in parsed:
+        obj = model
+        if pk is not None:
+            obj = instances.get((model, pk))
+            if obj is None:
+                output[ident] = ''
+                continue
+        context = Context(dict(arguments, request=request, obj=obj))
+        context[OUTPUT_MODE_CONTEXT_KEY] = HTML_OUTPUT
+        template = _get_placeholder_template(tag, arguments)
+        output[ident] = template.render(context).strip()
+    return output
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Requires `Django REST framework`_ 3.x; only import this if it is installed.
+
+.. _Django REST framework: http://www.django-rest-framework.org/
+
+.. versionadded:: 0.9.0
+"""
+from __future__ import unicode_literals
+from rest_framework import serializers
+from adminlinks.api import DEFAULT_VIEWS, links_for
+
+
+class AdminlinksField(serializers.Field):
+    """
+    A read-only field with the admin links for the object being serialized,
+    as built by :func:`~adminlinks.api.links_for`::
+
+        class PostSerializer(serializers.ModelSerializer):
+            admin = AdminlinksField()
+
+            class Meta:
+                model = Post
+
+    which gives ``{"admin": {"change": "/admin/...", "delete": "", ...}}``,
+    or ``null`` for users who may not use the admin.
+
+    The serializer's ``context`` must contain the ``request``, as it does when
+    used by the generic views. When serializing a page of objects
+    (``many=True``), the links for the whole page are built together, on
+    seeing the first object, so each :class:`~django.contrib.admin.ModelAdmin`
+    only has its permissions checked once.
+    """
+    def __init__(self, views=DEFAULT_VIEWS, admin_site='admin', query=None,
+                 **kwargs):
+        self.views = tuple(views)
+        self.admin_site = admin_site
+        self.query = query
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super(AdminlinksField, self).__init__(**kwargs)
+
+    def get_objects(self):
+        """
+        :return: everything being serialized by the outermost serializer.
+        """
+        instance = getattr(self.root, 'instance', None)
+        if instance is None:
+            return ()
+        if isinstance(self.root, serializers.ListSerializer):
+            return instance
+        return (instance,)
+
+    def get_links(self, obj):
+        request = self.context.get('request')
+        if request is None:
+            return {}
+        # shared by every serializer in the same tree, for every object.
+        cache = self.context.setdefault('_adminlinks_links', {})
+        key = (self.views, self.admin_site, self.query)
+        if key not in cache:
+            cache[key] = links_for(request, self.get_objects(), self.views,
+                                   self.admin_site, self.query)
+        links = cache[key]
+        if obj not in links:
+            # not part of the page; a nested serializer, perhaps.
+            links.update(links_for(request, [obj], self.views,
+                                   self.admin_site, self.query))
+        return links
+
+    def to_representation(self, obj):
+        item = self.get_links(obj).get(obj)
+        if item is None:
+            return None
+        return dict((view, item[view]) for view in self.views)
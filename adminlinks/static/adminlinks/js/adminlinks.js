@@ -4,6 +4,8 @@
     // when we close the popup, we check it to decide whether to reload.
     window.__data_changed__ = false;
     var cookie_key = 'django-adminlinks-state';
+    // set by the admin site for users who may see links.
+    var editor_cookie_key = 'django-adminlinks-editor';
     var final_cookie = encodeURIComponent(cookie_key) + '=' + encodeURIComponent(1);
 
     var on_popup_close = function(event, action, data) {
@@ -18,6 +20,34 @@
         }
     };
 
+    // popups closed by `success_post_message` send their data here, rather
+    // than using this page's jQuery directly. They only post to the admin's
+    // origin, which must be this page's too.
+    var on_message = function(event) {
+        var original = event.originalEvent || event;
+        var origin = window.location.protocol + '//' + window.location.host;
+        if (original.origin !== origin) {
+            return;
+        }
+        var from_popup = false;
+        $('iframe').each(function() {
+            from_popup = from_popup || this.contentWindow === original.source;
+        });
+        if (from_popup === false) {
+            return;
+        }
+        var message;
+        try {
+            message = $.parseJSON(original.data);
+        } catch (e) {
+            return;
+        }
+        if (message && message.adminlinks === 'success') {
+            window.__data_changed__ = true;
+            $(document).trigger('fancyiframe-close', [message.data]);
+        }
+    };
+
     var toggle_editing = function(event) {
         if ($.inArray(final_cookie, document.cookie.split('; ')) > -1) {
             $(document.body).addClass('django-adminlinks--admin-editing');
@@ -39,9 +69,85 @@
     };
 
 
-    var adminlinks_setup = function() {
-        if (window.frameElement === null) {
-            $('.django-adminlinks--btn').fancyiframe({
+    var get_cookie = function(name) {
+        var cookies = document.cookie ? document.cookie.split('; ') : [];
+        for (var i = 0; i < cookies.length; i++) {
+            var parts = cookies[i].split('=');
+            if (decodeURIComponent(parts[0]) === name) {
+                return decodeURIComponent(parts.slice(1).join('='));
+            }
+        }
+        return null;
+    };
+
+    // simple fields are changed in-place, with one small request, rather
+    // than by loading the admin into the popup.
+    var save_inline = function($link, value, stored) {
+        return $.ajax({
+            url: $link.attr('data-adminlinks-inline'),
+            type: 'PATCH',
+            dataType: 'json',
+            contentType: 'application/json',
+            data: JSON.stringify({value: value}),
+            beforeSend: function(xhr) {
+                xhr.setRequestHeader('X-CSRFToken', get_cookie('csrftoken'));
+            }
+        }).done(function(data) {
+            $link.attr('data-adminlinks-value', stored)
+                .removeClass('django-adminlinks--error')
+                .removeAttr('title');
+            $(document).trigger('adminlinks-inline-saved', [data, value, $link]);
+        }).fail(function(xhr) {
+            var messages = [];
+            try {
+                $.each($.parseJSON(xhr.responseText).errors, function(field, errors) {
+                    messages = messages.concat(errors);
+                });
+            } catch (e) {}
+            $link.addClass('django-adminlinks--error')
+                .attr('title', messages.join(' '));
+        });
+    };
+
+    var edit_inline = function(event) {
+        event.preventDefault();
+        var $link = $(this);
+        var current = $link.attr('data-adminlinks-value');
+        if ($link.attr('data-adminlinks-type') === 'boolean') {
+            var checked = current !== 'True';
+            return save_inline($link, checked, checked ? 'True' : 'False').done(function() {
+                var $img = $link.find('img');
+                $img.attr('src', $img.attr('src').replace(/icon-(yes|no|unknown)/,
+                                                          checked ? 'icon-yes' : 'icon-no'));
+            });
+        }
+        var $input = $('<input class="django-adminlinks--inline">')
+            .attr('type', $link.attr('data-adminlinks-type') === 'number' ? 'number' : 'text')
+            .val(current);
+        var finish = function() {
+            $input.remove();
+            $link.show();
+        };
+        $input.bind('keydown', function(event) {
+            if (event.which === 13) {
+                event.preventDefault();
+                save_inline($link, $input.val(), $input.val()).always(finish);
+            } else if (event.which === 27) {
+                finish();
+            }
+        }).bind('blur', finish);
+        $link.hide().after($input);
+        $input.focus();
+    };
+
+    var bind_buttons = function($scope) {
+        var $all = $scope.filter('.django-adminlinks--btn')
+            .add($scope.find('.django-adminlinks--btn'));
+        var $inline = $all.filter('[data-adminlinks-inline]');
+        var $buttons = $all.not($inline);
+        $inline.bind('click', edit_inline);
+        if (window.frameElement === null && $buttons.length > 0) {
+            $buttons.fancyiframe({
                 debug: true,
                 elements: {
                     prefix: 'django-adminlinks',
@@ -54,18 +160,75 @@
                 }
             });
         }
-        // this has to be here because of document readiness
-        var $toggles = $('.django-adminlinks--toggle');
+        var $toggles = $scope.filter('.django-adminlinks--toggle')
+            .add($scope.find('.django-adminlinks--toggle'));
         if ($toggles.length > 0) {
             $(document.body).addClass('django-adminlinks--maytoggle');
             toggle_editing($.Event());
             $toggles.bind('click', set_toggle_state);
         }
+    };
 
+    // placeholders are the same for everyone; each admin site is asked once
+    // for whatever this user may actually see. Visitors who have never
+    // signed in to the admin have nothing to see, so don't ask.
+    var fill_placeholders = function() {
+        var $placeholders = $('.django-adminlinks--placeholder');
+        var endpoints = {};
+        if ($placeholders.length === 0 || get_cookie(editor_cookie_key) === null) {
+            return;
+        }
+        $placeholders.each(function(index) {
+            var $placeholder = $(this);
+            var endpoint = $placeholder.attr('data-adminlinks-endpoint');
+            var ident = String(index);
+            $placeholder.attr('data-adminlinks-id', ident);
+            if (endpoints[endpoint] === void(0)) {
+                endpoints[endpoint] = [];
+            }
+            endpoints[endpoint].push({
+                id: ident,
+                tag: $placeholder.attr('data-adminlinks-tag'),
+                model: $placeholder.attr('data-adminlinks-model') || '',
+                pk: $placeholder.attr('data-adminlinks-pk') || '',
+                arguments: $.parseJSON($placeholder.attr('data-adminlinks-arguments'))
+            });
+        });
+        $.each(endpoints, function(endpoint, placeholders) {
+            $.ajax({
+                url: endpoint,
+                type: 'POST',
+                dataType: 'json',
+                contentType: 'application/json',
+                data: JSON.stringify({placeholders: placeholders}),
+                beforeSend: function(xhr) {
+                    xhr.setRequestHeader('X-CSRFToken', get_cookie('csrftoken'));
+                },
+                success: function(data) {
+                    $.each(data.html || {}, function(ident, html) {
+                        var $placeholder = $placeholders.filter('[data-adminlinks-id="' + ident + '"]');
+                        if (html === '') {
+                            $placeholder.remove();
+                            return;
+                        }
+                        var $html = $(html);
+                        $placeholder.replaceWith($html);
+                        bind_buttons($html);
+                    });
+                    $(document).trigger('adminlinks-placeholders-filled');
+                }
+            });
+        });
+    };
 
+    var adminlinks_setup = function() {
+        // this has to be here because of document readiness
+        bind_buttons($(document.body));
+        fill_placeholders();
     };
     // hopefully doing what https://github.com/kossnocorp/jquery.turbolinks says
     // so that after a Turbolinks refresh, events work?
     $(document).bind('fancyiframe-close', on_popup_close);
+    $(window).bind('message', on_message);
     $(document).ready(adminlinks_setup);
 })(typeof django !== 'undefined' && django.jQuery || window.jQuery, document);
@@ -0,0 +1,13 @@
+;(function(window, document, undefined) {
+    // loaded by the page which replaces the popup after a successful save,
+    // to hand its data to whichever page opened the popup. The browser only
+    // delivers it if that page is on the admin's own origin.
+    var element = document.getElementById('django-adminlinks-success');
+    var data = element.textContent || element.innerText;
+    var target = window.parent !== window ? window.parent : window.opener;
+    window.__data_changed__ = true;
+    var origin = window.location.protocol + '//' + window.location.host;
+    if (target) {
+        target.postMessage('{"adminlinks": "success", "data": ' + data + '}', origin);
+    }
+})(window, document);
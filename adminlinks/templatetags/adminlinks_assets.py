@@ -1,13 +1,84 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+import logging
+try:
+    from urlparse import urljoin
+except ImportError:  # Python 3
+    from urllib.parse import urljoin
+from django.conf import settings
+from django.contrib.staticfiles import finders
 from django.template.base import Library
+from classytags.arguments import ChoiceArgument
+from classytags.core import Options
 from classytags.helpers import InclusionTag
+try:
+    from django.contrib.staticfiles.templatetags.staticfiles import static
+except ImportError:  # < Django 1.4
+    def static(path):
+        return '%s%s' % (settings.STATIC_URL or '', path)
+from adminlinks.constants import (HTML_OUTPUT, BUNDLE_CSS, BUNDLE_CSS_NAME,
+                                  BUNDLE_JS, BUNDLE_JS_NAME)
+from adminlinks.instrumentation import InstrumentedTag
+from adminlinks.placeholders import get_output_mode
 from adminlinks.templatetags.utils import context_passes_test
 
 register = Library()
+logger = logging.getLogger(__name__)
 
 
-class AdminlinksCssShortcut(InclusionTag):
+def get_bundle_url(name):
+    """
+    :return: the url of the bundle made by the ``adminlinks_bundle``
+             management command, as given by ``STATICFILES_STORAGE``, or an
+             empty string if ``ADMINLINKS_BUNDLE`` isn't set, or the bundle
+             hasn't been built (so the separate files are used).
+
+    .. versionadded:: 0.9.0
+    """
+    if not getattr(settings, 'ADMINLINKS_BUNDLE', False):
+        return ''
+    # without DEBUG, a storage which hashes names raises for missing files
+    # itself; with it, the files are served from wherever the finders say.
+    if settings.DEBUG and finders.find(name) is None:
+        logger.warning('{0} has not been built; run the adminlinks_bundle '
+                       'command'.format(name))
+        return ''
+    try:
+        return static(name)
+    except ValueError:
+        logger.warning('{0} has not been built; run the adminlinks_bundle '
+                       'command, then collectstatic'.format(name))
+        return ''
+
+
+def get_asset_urls(debug=False):
+    """
+    :param debug: whether the templates are given ``debug`` (see
+                  :func:`~django.core.context_processors.debug`), in which
+                  case they add a query string to the separate files which
+                  changes every time, so those are left out; preloading them
+                  would only download everything twice.
+    :return: the url of every script and stylesheet the asset tags load, and
+             whether each is a ``script`` or ``style``, in the order they are
+             loaded.
+    :rtype: list of tuples.
+
+    .. versionadded:: 0.9.0
+    """
+    assets = []
+    for bundle, files, kind in ((BUNDLE_CSS_NAME, BUNDLE_CSS, 'style'),
+                                (BUNDLE_JS_NAME, BUNDLE_JS, 'script')):
+        bundle_url = get_bundle_url(bundle)
+        if bundle_url:
+            assets.append((bundle_url, kind))
+        elif not debug:
+            # the same as {% static %}, which the templates use.
+            assets.extend((urljoin(settings.STATIC_URL or '', name), kind)
+                          for name in files)
+    return assets
+
+
+class AdminlinksCssShortcut(InstrumentedTag, InclusionTag):
     """
     Helper for rendering any Stylesheets (CSS) we want to ship by default. Can
     include inline (inside a `<style>` tag) or external (via a `<link>` tag)
@@ -23,23 +94,35 @@ class AdminlinksCssShortcut(InclusionTag):
                         checked via
                         :meth:`~adminlinks.templatetags.utils.context_passes_test`,
                         and the result **always** put into the context.
+                        When rendering placeholders or ESI, assets are always
+                        loaded, as the fragments need them. With
+                        ``ADMINLINKS_BUNDLE``, ``bundle_url`` is also added.
         :return: the context, possibly modified with a new layer.
         :rtype: :class:`~django.template.RequestContext` or other context/
                 dictionary-like object.
         """
-        result = context_passes_test(context)
-        context.update({'should_load_assets': result})
+        result = (get_output_mode(context) != HTML_OUTPUT
+                  or context_passes_test(context))
+        context.update({'should_load_assets': result,
+                        'bundle_url': result and get_bundle_url(BUNDLE_CSS_NAME)})
         return context
 register.tag(name='render_adminlinks_css', compile_function=AdminlinksCssShortcut)
 
 
-class AdminlinksJsShortcut(InclusionTag):
+class AdminlinksJsShortcut(InstrumentedTag, InclusionTag):
     """
     Helper for rendering any JavaScript we want to ship by default,
     inline or as external scripts::
 
     {% render_adminlinks_js %}
+    {% render_adminlinks_js defer %}
+    {% render_adminlinks_js async %}
 
+    .. versionchanged:: 0.9.0
+        scripts may be loaded with ``defer``, so they don't block rendering
+        the page, or ``async``. As the scripts depend on each other,
+        ``async`` is only used for the single file made by the
+        ``adminlinks_bundle`` command; otherwise they are deferred.
     """
     #: How to call this tag from a template.
     name = 'render_adminlinks_js'
@@ -48,7 +131,12 @@ class AdminlinksJsShortcut(InclusionTag):
     #: project-level templates.
     template = 'adminlinks/js.html'
 
-    def get_context(self, context):
+    options = Options(
+        ChoiceArgument('loading', required=False, resolve=False, default='',
+                       choices=['defer', 'async']),
+    )
+
+    def get_context(self, context, loading):
         """
         Tests and updates the existing context.
 
@@ -56,11 +144,48 @@ class AdminlinksJsShortcut(InclusionTag):
                         checked via
                         :meth:`~adminlinks.templatetags.utils.context_passes_test`,
                         and the result **always** put into the context.
+                        When rendering placeholders or ESI, assets are always
+                        loaded, as the fragments need them. With
+                        ``ADMINLINKS_BUNDLE``, ``bundle_url`` is also added.
         :return: the context, possibly modified with a new layer.
         :rtype: :class:`~django.template.RequestContext` or other context/
                 dictionary-like object.
         """
-        result = context_passes_test(context)
-        context.update({'should_load_assets': result})
+        result = (get_output_mode(context) != HTML_OUTPUT
+                  or context_passes_test(context))
+        bundle_url = result and get_bundle_url(BUNDLE_JS_NAME)
+        if loading == 'async' and not bundle_url:
+            loading = 'defer'
+        context.update({'should_load_assets': result,
+                        'bundle_url': bundle_url,
+                        'loading': loading})
         return context
 register.tag(name=AdminlinksJsShortcut.name, compile_function=AdminlinksJsShortcut)
+
+
+class AdminlinksPreload(InstrumentedTag, InclusionTag):
+    """
+    Renders ``<link rel="preload">`` for each of the files loaded by
+    ``{% render_adminlinks_js %}`` and ``{% render_adminlinks_css %}``, so
+    that putting it in the ``<head>`` lets the browser fetch them early, even
+    if the scripts are at the end of the page::
+
+    {% render_adminlinks_preload %}
+
+    Like the other tags, nothing is rendered for users who wouldn't see any
+    links. :class:`~adminlinks.middleware.PreloadMiddleware` does the same
+    with headers instead.
+
+    .. versionadded:: 0.9.0
+    """
+    name = 'render_adminlinks_preload'
+    template = 'adminlinks/preload.html'
+
+    def get_context(self, context):
+        result = (get_output_mode(context) != HTML_OUTPUT
+                  or context_passes_test(context))
+        context.update({'should_load_assets': result,
+                        'assets': result and get_asset_urls(
+                            debug=bool(context.get('debug'))) or ()})
+        return context
+register.tag(name=AdminlinksPreload.name, compile_function=AdminlinksPreload)
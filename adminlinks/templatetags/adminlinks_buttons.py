@@ -1,14 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 import logging
+try:
+    from collections import OrderedDict
+except ImportError:  # Python 2.6
+    from django.utils.datastructures import SortedDict as OrderedDict
 from classytags.arguments import Argument, StringArgument, ChoiceArgument
-from classytags.core import Options
+from classytags.core import Options, Tag
 from django.template.base import Library
-from classytags.helpers import InclusionTag
+from classytags.helpers import AsTag, InclusionTag
+from django.http import QueryDict
 from django.template.defaultfilters import yesno
+try:
+    from django.utils.encoding import force_text
+except ImportError:  # < Django 1.5
+    from django.utils.encoding import force_unicode as force_text
+from adminlinks.api import _links_for
+from adminlinks.constants import HTML_OUTPUT, MODELADMIN_REVERSE
+from adminlinks.instrumentation import InstrumentedTag
+from adminlinks.placeholders import PlaceholderTag, get_output_mode
 from adminlinks.templatetags.utils import (context_passes_test,
                                            get_admin_site,
-                                           get_registered_modeladmins,
+                                           get_modeladmin_index,
+                                           _get_model_key,
                                            _admin_link_shortcut,
                                            _add_link_to_context,
                                            _add_custom_link_to_context)
@@ -16,7 +30,7 @@ register = Library()
 logger = logging.getLogger(__name__)
 
 
-class BaseAdminLink(object):
+class BaseAdminLink(InstrumentedTag, PlaceholderTag):
     """
     Class for mixing into other classes to provide
     :meth:`~adminlinks.templatetags.adminlinks_buttons.BaseAdminLink.is_valid`,
@@ -29,6 +43,10 @@ class BaseAdminLink(object):
     Also provides
     :attr:`~adminlinks.templatetags.adminlinks_buttons.BaseAdminLink.base_options`
     suitable for using in classy tags.
+
+    .. versionchanged:: 0.9.0
+        subclasses render a placeholder instead, if the output mode is
+        **"placeholder"**. See :mod:`~adminlinks.placeholders`
     """
 
     #: Default options involved in :class:`~classytags.helpers.InclusionTag`
@@ -39,6 +57,9 @@ class BaseAdminLink(object):
                     StringArgument('admin_site', required=False, default='admin'),
                     Argument('querystring', required=False, default=''))
 
+    placeholder_library = 'adminlinks_buttons'
+    placeholder_arguments = ('obj', 'admin_site', 'querystring')
+
     def is_valid(self, context, obj, *args, **kwargs):
         """
         Performs some basic tests against the parameters passed to it to
@@ -90,6 +111,7 @@ class Edit(BaseAdminLink, InclusionTag):
         {% render_edit_button my_obj "my_custom_admin" %}
         {% render_edit_button my_obj "my_custom_admin" "a=1&b=2&a=3" %}
     """
+    name = 'render_edit_button'
     template = 'adminlinks/edit_link.html'
 
     # uses :attr:`~adminlinks.templatetags.adminlinks_buttons.BaseAdminLink.base_options`
@@ -115,7 +137,7 @@ class Edit(BaseAdminLink, InclusionTag):
         """
         return _add_link_to_context(admin_site, context['request'],
                                     obj._meta, 'change', [obj.pk],
-                                    query=querystring)
+                                    query=querystring, obj=obj)
 register.tag(name='render_edit_button', compile_function=Edit)
 
 
@@ -141,7 +163,27 @@ class EditField(BaseAdminLink, InclusionTag):
         :class:`~django.db.models.NullBooleanField`, so that it can render
         an icon.
     """
+    name = 'render_edit_field_button'
     template = 'adminlinks/edit_field_link.html'
+    placeholder_arguments = ('obj', 'fieldname', 'admin_site', 'querystring')
+
+    #: fields which the :ref:`bundled JavaScript <bundled_js>` may edit
+    #: in-place, using
+    #: :meth:`~adminlinks.admin.AdminlinksMixin.change_field_json`, by their
+    #: :meth:`~django.db.models.Field.get_internal_type`
+    inline_types = {
+        'BooleanField': 'boolean',
+        'NullBooleanField': 'boolean',
+        'CharField': 'text',
+        'SlugField': 'text',
+        'IntegerField': 'number',
+        'BigIntegerField': 'number',
+        'SmallIntegerField': 'number',
+        'PositiveIntegerField': 'number',
+        'PositiveSmallIntegerField': 'number',
+        'FloatField': 'number',
+        'DecimalField': 'number',
+    }
 
     options = Options(BaseAdminLink.base_options[0],  # obj
                       StringArgument('fieldname', required=True),
@@ -171,7 +213,7 @@ class EditField(BaseAdminLink, InclusionTag):
                                                obj._meta, 'change',
                                                'change_field',
                                                [obj.pk, fieldname],
-                                               query=querystring))
+                                               query=querystring, obj=obj))
         # successfully loaded link, add the fieldname.
         if 'link' in ctx:
             field = obj._meta.get_field(fieldname)
@@ -181,10 +223,110 @@ class EditField(BaseAdminLink, InclusionTag):
                 ctx.update(maybe_boolean=True, img=icon)
             ctx.update(verbose_name=field.verbose_name,
                        existing_value=value)
+            if ctx['link']:
+                ctx.update(self.get_inline_context(context, obj, field,
+                                                   admin_site))
         return ctx
+
+    def get_inline_context(self, context, obj, field, admin_site):
+        """
+        :return: the ``inline_type`` and ``inline_link`` for editing the
+                 field in-place, if the
+                 :class:`~django.contrib.admin.ModelAdmin` allows it.
+        :rtype: dictionary.
+
+        .. versionadded:: 0.9.0
+        """
+        inline_type = self.inline_types.get(field.get_internal_type())
+        if inline_type is None or field.choices:
+            return {}
+        site = get_admin_site(admin_site)
+        lookup = _get_model_key(obj._meta)
+        modeladmin = get_modeladmin_index(context['request'],
+                                          site).registry[lookup][1]
+        if not (hasattr(modeladmin, 'can_change_field_inline')
+                and modeladmin.can_change_field_inline(field.name)):
+            return {}
+        link = _add_custom_link_to_context(admin_site, context['request'],
+                                           obj._meta, 'change',
+                                           'change_field_json',
+                                           [obj.pk, field.name], obj=obj)
+        return {'inline_type': inline_type, 'inline_link': link['link']}
 register.tag(name='render_edit_field_button', compile_function=EditField)
 
 
+class BulkEditField(BaseAdminLink, InclusionTag):
+    """
+    An :class:`~classytags.helpers.InclusionTag` to render a link to
+    :meth:`~adminlinks.admin.AdminlinksMixin.change_field_bulk`, for changing
+    the requested field on every object in a list at once::
+
+        {% render_bulk_edit_field_button object_list "field_name" %}
+        {% render_bulk_edit_field_button object_list "field_name" "my_custom_admin" %}
+        {% render_bulk_edit_field_button object_list "field_name" "my_custom_admin" "a=1&b=2&a=3" %}
+
+    Objects the user may not change are left out, and nothing is rendered if
+    that leaves none, or if the field can't be changed in bulk.
+
+    .. versionadded:: 0.9.0
+    """
+    name = 'render_bulk_edit_field_button'
+    template = 'adminlinks/edit_field_bulk_link.html'
+    placeholder_library = None
+
+    options = Options(Argument('object_list', required=True),
+                      StringArgument('fieldname', required=True),
+                      *BaseAdminLink.base_options[1:])  # admin_site, querystring
+
+    def get_context(self, context, object_list, fieldname, admin_site,
+                    querystring):
+        """
+        :param context: Hopefully, a :class:`~django.template.RequestContext`
+        :param object_list: a :class:`~django.db.models.query.QuerySet` or
+                            list of instances of a single model.
+        :param fieldname: the specific model field to render a link for.
+        :param admin_site: name of the admin site to use; defaults to **"admin"**
+        :param querystring: a querystring to include in the link output.
+        :return: the link values.
+        :rtype: dictionary.
+        """
+        if not context_passes_test(context):
+            logger.debug('Invalid context')
+            return {}
+        objs = [obj for obj in object_list or ()
+                if hasattr(obj, '_meta') and obj.pk is not None]
+        site = get_admin_site(admin_site)
+        if not objs or site is None:
+            return {}
+        opts = objs[0]._meta
+        admins = get_modeladmin_index(context['request'], site)
+        lookup = _get_model_key(opts)
+        if lookup not in admins or 'change' not in admins[lookup]:
+            return {}
+        modeladmin = admins.registry[lookup][1]
+        if not (hasattr(modeladmin, 'can_change_field_in_bulk')
+                and modeladmin.can_change_field_in_bulk(fieldname)):
+            logger.debug('%s cannot be changed in bulk' % fieldname)
+            return {}
+        permitted = admins.get_permitted_pks(lookup, objs, 'change')
+        pks = [force_text(obj.pk) for obj in objs
+               if permitted is None or obj.pk in permitted]
+        if not pks:
+            return {}
+        query = QueryDict(querystring or '', mutable=True)
+        query['pks'] = ','.join(pks)
+        link = _admin_link_shortcut(MODELADMIN_REVERSE % {
+            'namespace': site.name,
+            'app': lookup[0],
+            'module': lookup[1],
+            'view': 'change_field_bulk',
+        }, [fieldname], query.urlencode())
+        return {'link': link, 'count': len(pks),
+                'verbose_name': opts.get_field(fieldname).verbose_name,
+                'verbose_name_plural': opts.verbose_name_plural}
+register.tag(name='render_bulk_edit_field_button', compile_function=BulkEditField)
+
+
 class Delete(BaseAdminLink, InclusionTag):
     """
     An :class:`~classytags.helpers.InclusionTag` to render a link
@@ -194,6 +336,7 @@ class Delete(BaseAdminLink, InclusionTag):
         {% render_delete_button my_obj "my_custom_admin" %}
         {% render_delete_button my_obj "my_custom_admin" "a=1&b=2&a=3" %}
     """
+    name = 'render_delete_button'
     template = 'adminlinks/delete_link.html'
 
     # uses :attr:`~adminlinks.templatetags.adminlinks_buttons.BaseAdminLink.base_options`
@@ -219,7 +362,7 @@ class Delete(BaseAdminLink, InclusionTag):
         """
         return _add_link_to_context(admin_site, context['request'],
                                     obj._meta, 'delete', [obj.pk],
-                                    query=querystring)
+                                    query=querystring, obj=obj)
 register.tag(name='render_delete_button', compile_function=Delete)
 
 
@@ -235,7 +378,9 @@ class Add(BaseAdminLink, InclusionTag):
         {% render_add_button my_class "my_custom_admin" %}
         {% render_add_button my_class "my_custom_admin" "a=1&b=2&a=3" %}
     """
+    name = 'render_add_button'
     template = 'adminlinks/add_link.html'
+    placeholder_needs_instance = False
 
     # uses :attr:`~adminlinks.templatetags.adminlinks_buttons.BaseAdminLink.base_options`
     options = Options(*BaseAdminLink.base_options)
@@ -273,6 +418,7 @@ class History(BaseAdminLink, InclusionTag):
         {% render_history_button my_obj "my_custom_admin" %}
         {% render_history_button my_obj "my_custom_admin" "a=1&b=2&a=3" %}
     """
+    name = 'render_history_button'
 
     #: what gets rendered by this tag.
     template = 'adminlinks/history_link.html'
@@ -300,7 +446,7 @@ class History(BaseAdminLink, InclusionTag):
         """
         return _add_link_to_context(admin_site, context['request'],
                                     obj._meta, 'history', [obj.pk],
-                                    query=querystring)
+                                    query=querystring, obj=obj)
 register.tag(name='render_history_button', compile_function=History)
 
 
@@ -314,8 +460,10 @@ class ChangeList(BaseAdminLink, InclusionTag):
         {% render_changelist_button my_class "my_custom_admin" %}
         {% render_changelist_button my_class "my_custom_admin" "a=1&b=2&a=3" %}
     """
+    name = 'render_changelist_button'
 
     template = 'adminlinks/changelist_link.html'
+    placeholder_needs_instance = False
 
     # This needs to have a different default querystring, because of
     # https://code.djangoproject.com/ticket/20288#ticket
@@ -358,7 +506,9 @@ class Combined(BaseAdminLink, InclusionTag):
     """
     This needs reworking, I think.
     """
+    name = 'render_admin_buttons'
     template = 'adminlinks/grouped_link.html'
+    placeholder_arguments = ('obj', 'admin_site')
 
     options = Options(
         Argument('obj', required=True),
@@ -386,19 +536,19 @@ class Combined(BaseAdminLink, InclusionTag):
             logger.debug('Invalid admin site')
             return context
 
-        admins = get_registered_modeladmins(context['request'], site)
-        app_key = opts.app_label
-        if hasattr(opts, 'model_name'):
-            model_key = opts.model_name
-        else:
-            model_key = opts.module_name
-        lookup = (app_key.lower(), model_key.lower())
+        admins = get_modeladmin_index(context['request'], site)
+        lookup = _get_model_key(opts)
 
         if not lookup in admins:
             logger.debug('%s:%s not in admin' % lookup)
             return context
 
         modeladmin_links = admins[lookup]
+        if not isinstance(obj, type):
+            modeladmin_links = dict(modeladmin_links)
+            for view in ('change', 'history', 'delete'):
+                if not admins.has_object_permission(lookup, obj, view):
+                    modeladmin_links.pop(view, None)
         links = {
             'add': _admin_link_shortcut(
                 modeladmin_links.get('add', '')
@@ -421,7 +571,131 @@ class Combined(BaseAdminLink, InclusionTag):
 register.tag(name='render_admin_buttons', compile_function=Combined)
 
 
-class AdminRoot(InclusionTag):
+class AdminlinksFor(BaseAdminLink, AsTag):
+    """
+    An :class:`~classytags.helpers.AsTag` which works out the links for every
+    object in a list at once, so that the permissions for each
+    :class:`~django.db.models.Model` are only checked once::
+
+        {% adminlinks_for object_list as links %}
+        {% adminlinks_for object_list "my_custom_admin" as links %}
+        {% adminlinks_for object_list "my_custom_admin" "a=1&b=2&a=3" as links %}
+
+    The result is a dictionary keyed by each object's primary key, in the
+    same order as the original list, so it's best used with lists containing
+    only one type of :class:`~django.db.models.Model`. Each value contains the
+    ``object`` itself, its ``verbose_name``, and the ``change``, ``delete``
+    and ``history`` links, any of which may be empty::
+
+        {% for pk, item in links.items %}
+            {% include "adminlinks/edit_link.html" with link=item.change verbose_name=item.verbose_name only %}
+        {% endfor %}
+
+    Or, when looping over the original list, use the
+    :func:`~adminlinks.templatetags.adminlinks_buttons.adminlinks_get` filter::
+
+        {% for obj in object_list %}
+            {% with item=links|adminlinks_get:obj %}
+                {% include "adminlinks/delete_link.html" with link=item.delete verbose_name=item.verbose_name only %}
+            {% endwith %}
+        {% endfor %}
+
+    .. versionadded:: 0.9.0
+    """
+    #: which links are built for every object.
+    permissions = ('change', 'delete', 'history')
+
+    # the links are data for the template, not output, so can't be deferred.
+    placeholder_library = None
+
+    options = Options(
+        Argument('object_list', required=True),
+        BaseAdminLink.base_options[1],  # admin_site
+        BaseAdminLink.base_options[2],  # querystring
+        'as',
+        Argument('varname', required=False, resolve=False),
+    )
+
+    def get_value(self, context, object_list, admin_site, querystring):
+        """
+        :param context: Hopefully, a :class:`~django.template.RequestContext`
+                        otherwise :meth:`~adminlinks.templatetags.adminlinks_buttons.BaseAdminLink.is_valid`
+                        is unlikely to be :data:`True`
+        :param object_list: any iterable of :class:`~django.db.models.Model`
+                            instances, such as a
+                            :class:`~django.db.models.query.QuerySet`
+        :param admin_site: name of the admin site to use; defaults to **"admin"**
+        :param querystring: a querystring to include in the link output.
+        :return: the links for each object, keyed by primary key.
+        :rtype: dictionary.
+        """
+        if not context_passes_test(context):
+            logger.debug('Invalid context')
+            return OrderedDict()
+        links = _links_for(context['request'], object_list, self.permissions,
+                           admin_site, querystring, _admin_link_shortcut)
+        return OrderedDict((obj.pk, item) for obj, item in links.items())
+register.tag(name='adminlinks_for', compile_function=AdminlinksFor)
+
+
+@register.filter
+def adminlinks_get(links, obj):
+    """
+    Finds the links for an object in the results of
+    :class:`~adminlinks.templatetags.adminlinks_buttons.AdminlinksFor`::
+
+        {% with item=links|adminlinks_get:obj %}{{ item.change }}{% endwith %}
+
+    .. versionadded:: 0.9.0
+
+    :param links: the dictionary created by ``{% adminlinks_for %}``
+    :param obj: a :class:`~django.db.models.Model` instance, or primary key.
+    :return: the links for the object, or an empty dictionary.
+    :rtype: dictionary.
+    """
+    if not links:
+        return {}
+    return links.get(getattr(obj, 'pk', obj), {})
+
+
+class AdminlinksBlock(Tag):
+    """
+    Renders everything inside it only if
+    :func:`~adminlinks.templatetags.utils.context_passes_test` does, so that
+    for anonymous users none of the contained tags are rendered, or even have
+    their arguments resolved::
+
+        {% adminlinks_block %}
+            {% render_edit_button obj %}
+            {% render_delete_button obj %}
+        {% endadminlinks_block %}
+
+    .. note::
+        That includes tags which might otherwise show something to anyone,
+        like ``{% render_admin_button for anyone %}``.
+
+    When rendering placeholders or ESI (see :mod:`~adminlinks.placeholders`),
+    everything inside is always rendered.
+
+    .. versionadded:: 0.9.0
+    """
+    name = 'adminlinks_block'
+    options = Options(
+        blocks=[('endadminlinks_block', 'nodelist')],
+    )
+
+    def render_tag(self, context, nodelist):
+        # placeholders are the same for everyone, and checked later.
+        if get_output_mode(context) != HTML_OUTPUT:
+            return nodelist.render(context)
+        if not context_passes_test(context):
+            logger.debug('Invalid context; skipped the whole block')
+            return ''
+        return nodelist.render(context)
+register.tag(AdminlinksBlock)
+
+
+class AdminRoot(InstrumentedTag, PlaceholderTag, InclusionTag):
     options = Options(BaseAdminLink.base_options[1],  # admin_site
                       BaseAdminLink.base_options[2],  # querystring
                       'for',
@@ -434,6 +708,22 @@ class AdminRoot(InclusionTag):
                                                                'noone',
                                                                'none']))
     template = 'adminlinks/admin_root_link.html'
+    name = 'render_admin_button'
+    placeholder_library = 'adminlinks_buttons'
+    placeholder_arguments = ('admin_site', 'querystring', 'who')
+
+    def wants_placeholder(self, context, **kwargs):
+        # the same for everyone anyway.
+        if kwargs.get('who') in ('anyone', 'all', 'no-one', 'noone', 'none'):
+            return False
+        return super(AdminRoot, self).wants_placeholder(context, **kwargs)
+
+    @classmethod
+    def get_placeholder_source(cls, arguments):
+        # `who` isn't resolved, so has to be put into the template itself.
+        return '{%% load %s %%}{%% %s admin_site querystring for %s %%}' % (
+            cls.placeholder_library, cls.name,
+            'superusers' if arguments['who'] == 'superusers' else 'staff')
 
     def get_context(self, context, *args, **kwargs):
         """
@@ -473,4 +763,5 @@ register.tag(name='render_admin_button', compile_function=AdminRoot)
 
 class AdminlinksToggle(AdminRoot):
     template = 'adminlinks/admin_toggle.html'
+    name = 'render_toggle_button'
 register.tag(name='render_toggle_button', compile_function=AdminlinksToggle)
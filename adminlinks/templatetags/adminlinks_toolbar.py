@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
+from hashlib import md5
 from classytags.arguments import Flag, StringArgument
 from classytags.core import Options
+from django.conf import settings
+from django.core.urlresolvers import get_script_prefix, get_urlconf
 from django.template.base import Library
+from django.utils.translation import get_language
 from classytags.helpers import InclusionTag
+from adminlinks.constants import HTML_OUTPUT
+from adminlinks.instrumentation import InstrumentedTag
+from adminlinks.placeholders import PlaceholderTag, get_output_mode
+from adminlinks.permissions import get_cache, get_permission_snapshot
 from adminlinks.templatetags.utils import (context_passes_test, get_admin_site,
                                            get_registered_modeladmins,
                                            _resort_modeladmins)
@@ -10,8 +18,27 @@ from adminlinks.templatetags.utils import (context_passes_test, get_admin_site,
 register = Library()
 
 
-class AdminlinksToolbar(InclusionTag):
+class AdminlinksToolbar(InstrumentedTag, PlaceholderTag, InclusionTag):
+    """
+    An :class:`~classytags.helpers.InclusionTag` to render a dropdown of links
+    to the add view of every :class:`~django.contrib.admin.ModelAdmin` the
+    user may add to::
+
+        {% render_adminlinks_toolbar %}
+        {% render_adminlinks_toolbar "no" %}
+        {% render_adminlinks_toolbar "yes" "my_custom_admin" %}
+
+    .. versionchanged:: 0.9.0
+        if ``settings.ADMINLINKS_TOOLBAR_CACHE`` names one of the project's
+        ``CACHES``, the rendered toolbar is cached (for
+        ``ADMINLINKS_TOOLBAR_CACHE_TIMEOUT`` seconds, defaulting to 300) and
+        shared by every user with the same permissions. See
+        :meth:`~adminlinks.templatetags.adminlinks_toolbar.AdminlinksToolbar.get_cache_key`
+    """
+    name = 'render_adminlinks_toolbar'
     template = 'adminlinks/toolbar.html'
+    placeholder_library = 'adminlinks_toolbar'
+    placeholder_arguments = ('with_labels', 'admin_site')
 
     options = Options(
         Flag('with_labels',
@@ -39,4 +66,68 @@ class AdminlinksToolbar(InclusionTag):
                 'app_list': _resort_modeladmins(modeladmins),
             })
         return context
+
+    def get_cache_key(self, context, with_labels, admin_site):
+        """
+        The toolbar only varies by the admin site (and the models registered
+        to it), the language, and what the user is allowed to add, so the key
+        is a fingerprint of those. Users who share the same permissions (eg:
+        by being in the same groups) therefore share the same cached toolbar,
+        and changing the registry or the permissions changes the key.
+
+        .. note::
+            The fingerprint assumes each
+            :meth:`~django.contrib.admin.ModelAdmin.has_add_permission` only
+            depends on the user's permissions, as Django's does.
+
+        .. versionadded:: 0.9.0
+
+        :return: the cache key, or :data:`None` if the toolbar shouldn't be
+                 cached.
+        """
+        site = get_admin_site(admin_site)
+        if site is None or not context_passes_test(context):
+            return None
+        user = context['request'].user
+        if user.is_superuser:
+            permissions = ['*']
+        else:
+            snapshot = get_permission_snapshot(user)
+            if snapshot is not None:
+                permissions = sorted(snapshot.permissions)
+            else:
+                permissions = sorted(user.get_all_permissions())
+        registry = sorted('%s.%s:%s' % (model._meta.app_label,
+                                        model._meta.object_name,
+                                        model_admin.__class__.__name__)
+                          for model, model_admin in site._registry.items())
+        fingerprint = md5()
+        for part in ([site.name, get_language(), get_urlconf(),
+                      get_script_prefix(), self.template, with_labels]
+                     + registry + permissions):
+            fingerprint.update(('%s\n' % (part,)).encode('utf-8'))
+        return 'adminlinks:toolbar:%s' % fingerprint.hexdigest()
+
+    @classmethod
+    def get_placeholder_source(cls, arguments):
+        # flags aren't resolved, so have to be put into the template itself.
+        return '{%% load %s %%}{%% %s %s admin_site %%}' % (
+            cls.placeholder_library, cls.name,
+            'yes' if arguments['with_labels'] else 'no')
+
+    def render_tag(self, context, **kwargs):
+        alias = getattr(settings, 'ADMINLINKS_TOOLBAR_CACHE', None)
+        if alias is None or get_output_mode(context) != HTML_OUTPUT:
+            return super(AdminlinksToolbar, self).render_tag(context, **kwargs)
+        key = self.get_cache_key(context, **kwargs)
+        if key is None:
+            return super(AdminlinksToolbar, self).render_tag(context, **kwargs)
+        cache = get_cache(alias)
+        output = cache.get(key)
+        if output is None:
+            output = super(AdminlinksToolbar, self).render_tag(context,
+                                                               **kwargs)
+            timeout = getattr(settings, 'ADMINLINKS_TOOLBAR_CACHE_TIMEOUT', 300)
+            cache.set(key, output, timeout)
+        return output
 register.tag(name='render_adminlinks_toolbar', compile_function=AdminlinksToolbar)
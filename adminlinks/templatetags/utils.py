@@ -2,6 +2,8 @@
 from __future__ import unicode_literals
 from collections import defaultdict
 import logging
+import re
+import sys
 from distutils.version import LooseVersion
 from django.contrib.admin import AdminSite, site as PossibleAdminSite
 
@@ -13,13 +15,32 @@ except (ImportError, AttributeError) as e:  # Python 2, < Django 1.5
     from urlparse import urlsplit, urlunsplit
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from django.core.urlresolvers import reverse, resolve, NoReverseMatch
-# from django.utils.functional import memoize
+from django.core.urlresolvers import (reverse, resolve, NoReverseMatch,
+                                      get_resolver, get_script_prefix,
+                                      get_urlconf)
+try:
+    from django.core.signals import setting_changed
+except ImportError:  # < Django 1.8
+    from django.test.signals import setting_changed
+from django.dispatch import receiver
 from django.http import QueryDict
-from adminlinks.constants import MODELADMIN_REVERSE, PERMISSION_ATTRIBUTE
+try:
+    from django.utils.encoding import force_text
+except ImportError:  # < Django 1.5
+    from django.utils.encoding import force_unicode as force_text
+from django.utils.translation import get_language
+from adminlinks import instrumentation
+from adminlinks.constants import (MODELADMIN_REVERSE, PERMISSION_ATTRIBUTE,
+                                  OBJECT_PERMISSIONS)
+from adminlinks.permissions import get_permission_snapshot
 
 logger = logging.getLogger(__name__)
 _admin_sites_cache = {}
+_url_templates_cache = {}
+
+#: url arguments which :func:`~django.core.urlresolvers.reverse` would never
+#: need to quote, and so may be put straight into a compiled url template.
+_TEMPLATABLE_URL_ARG = re.compile(r'^[A-Za-z0-9_]+\Z')
 
 
 def context_passes_test(context):
@@ -33,6 +54,10 @@ def context_passes_test(context):
         Previously it was dependent on having a ``LOGGING`` configuration that
         would show the messages.
 
+    .. versionchanged:: 0.9.0
+        uses a :class:`~adminlinks.permissions.PermissionSnapshot` for the
+        user's permissions, if ``ADMINLINKS_PERMISSION_CACHE`` is set.
+
     :param context: a :class:`~django.template.RequestContext`. Accepts
                     any :class:`~django.template.Context` like object,
                     but it explicitly tests for a `request` key and
@@ -58,17 +83,20 @@ def context_passes_test(context):
         return False
 
     user = request.user
+    permissions = get_permission_snapshot(user)
+    if permissions is None:
+        permissions = user.get_all_permissions()
     valid_admin_conditions = [
         user.is_authenticated(),
         user.is_staff,
         user.is_active,
-        len(user.get_all_permissions()) > 0,
+        len(permissions) > 0,
     ]
     logger.debug('Tested conditions: %r' % valid_admin_conditions)
     return all(valid_admin_conditions)
 
 
-def get_admin_site(admin_site):
+def _get_admin_site(admin_site):
     """
     Given the name of an :class:`~django.contrib.admin.AdminSite` instance,
     try to resolve that into an actual object
@@ -86,16 +114,13 @@ def get_admin_site(admin_site):
              that given in the `admin_site` parameter.
     :rtype: :class:`~django.contrib.admin.AdminSite` or :data:`None`
     """
-
-    # pop a dictionary onto this function and use it for keeping track
-    # of discovered admin sites as they're found.
     logger.debug('admin site not previously discovered, so do the lookup')
     if PossibleAdminSite.name == admin_site:
         logger.info('Default site found')
         return PossibleAdminSite
     try:
         logger.debug('Custom admin site, not monkeypatched into contrib.admin')
-        for_resolving = reverse('%s:index' % admin_site)
+        for_resolving = _reverse('%s:index' % admin_site)
         wrapped_view = resolve(for_resolving)
         # unwrap the view, because all AdminSite urls get wrapped with a
         # decorator which goes through
@@ -106,12 +131,283 @@ def get_admin_site(admin_site):
     except (NoReverseMatch, StopIteration) as e:
         logger.exception("Failed to find adminsite.")
         return None
-# get_admin_site = memoize(_get_admin_site, _admin_sites_cache, num_args=1)
-# get_admin_site.__doc__ = """
-# The public API implementation of
-# :func:`~adminlinks.templatetags.utils._get_admin_site`, wrapped to use
-# memoization.
-# """
+
+
+def get_admin_site(admin_site):
+    """
+    The public API implementation of
+    :func:`~adminlinks.templatetags.utils._get_admin_site`, wrapped to use
+    memoization.
+
+    Both found and missing sites are remembered, for as long as the URLconf
+    they were looked up in stays the same.
+
+    .. versionchanged:: 0.9.0
+        memoization is enabled again, and discarded when the URLconf changes.
+
+    :param admin_site: the string name of an
+                       :class:`~django.contrib.admin.AdminSite` named
+                       and mounted on the project.
+    :return: an :class:`~django.contrib.admin.AdminSite` instance matching
+             that given in the `admin_site` parameter.
+    :rtype: :class:`~django.contrib.admin.AdminSite` or :data:`None`
+    """
+    instrumentation.incr('get_admin_site')
+    sites = _get_urlconf_cache(_admin_sites_cache)
+    if admin_site not in sites:
+        sites[admin_site] = _get_admin_site(admin_site)
+    return sites[admin_site]
+
+
+def get_admin_sites():
+    """
+    Finds every :class:`~django.contrib.admin.AdminSite` mounted in the
+    current URLconf, under a single-level URL namespace.
+
+    .. versionadded:: 0.9.0
+
+    :return: the discovered admin sites, ordered by name.
+    :rtype: :data:`list` of :class:`~django.contrib.admin.AdminSite` instances
+    """
+    resolver = get_resolver(get_urlconf())
+    namespaces = resolver.app_dict.get(PossibleAdminSite.app_name, ())
+    sites = (get_admin_site(namespace) for namespace in namespaces)
+    return sorted((site for site in sites if site is not None),
+                  key=lambda site: site.name)
+
+
+def _get_model_key(opts):
+    """
+    Builds the key used to find a :class:`~django.db.models.Model` in the
+    results of :func:`~adminlinks.templatetags.utils.get_registered_modeladmins`
+
+    .. versionadded:: 0.9.0
+
+    :param opts: the `_meta` Options object of a model class or instance.
+    :return: the lowercased `app_label` and `model_name` (or `module_name`
+             before Django 1.6)
+    :rtype: :data:`tuple`
+    """
+    app_key = opts.app_label
+    if hasattr(opts, 'model_name'):
+        model_key = opts.model_name
+    else:
+        model_key = opts.module_name
+    return app_key.lower(), model_key.lower()
+
+
+class ModelAdminIndex(object):
+    """
+    A lazily populated version of the dictionary returned by
+    :func:`~adminlinks.templatetags.utils.get_registered_modeladmins`, scoped
+    to a single request and :class:`~django.contrib.admin.AdminSite`.
+
+    Nothing is computed until a model is asked for, at which point the
+    permissions for only that :class:`~django.contrib.admin.ModelAdmin` are
+    tested and remembered, so rendering many links for the same model only
+    pays for the permission checks once.
+
+    Use :func:`~adminlinks.templatetags.utils.get_modeladmin_index` rather
+    than instantiating this directly, so that every template tag on a page
+    shares the same instance.
+
+    .. versionadded:: 0.9.0
+    """
+    def __init__(self, request, admin_site):
+        self.request = request
+        self.user = getattr(request, 'user', None)
+        self.admin_site = admin_site
+        self._registry = None
+        self._entries = {}
+        self._module_perms = {}
+        self._object_perms = {}
+
+    @property
+    def registry(self):
+        """
+        Maps every key (see
+        :func:`~adminlinks.templatetags.utils._get_model_key`) to the
+        :class:`~django.db.models.Model` and
+        :class:`~django.contrib.admin.ModelAdmin` registered for it. No
+        permissions are tested.
+        """
+        if self._registry is None:
+            instrumentation.incr('registry_walks')
+            self._registry = dict(
+                (_get_model_key(model._meta), (model, model_admin))
+                for model, model_admin in self.admin_site._registry.items())
+        return self._registry
+
+    def has_module_perms(self, app_label):
+        if app_label not in self._module_perms:
+            user = self.request.user
+            snapshot = get_permission_snapshot(user)
+            if snapshot is not None:
+                has_perms = snapshot.has_module_perms(user, app_label)
+            else:
+                has_perms = user.has_module_perms(app_label)
+            self._module_perms[app_label] = has_perms
+        return self._module_perms[app_label]
+
+    def build_entry(self, model, model_admin):
+        """
+        Tests the permissions for a single
+        :class:`~django.contrib.admin.ModelAdmin`, limiting the methods
+        available (add/edit/history/delete) as appropriate.
+
+        :return: the named urls (and the add/change/delete links) available,
+                 or :data:`None` if the user cannot see this app at all.
+        :rtype: :data:`dictionary` or :data:`None`
+        """
+        app_key = model._meta.app_label
+        if not self.has_module_perms(app_key):
+            return None
+        # TODO: if a model has parents, use get_parent_list on the Options
+        # instance to test all base permissions.
+        urlparts = {
+            'namespace': self.admin_site.name,
+            'app': app_key,
+            'module': _get_model_key(model._meta)[1],
+        }
+        entry = {'name': model._meta.verbose_name}
+
+        for val in ('history', 'changelist'):
+            urlparts.update(view=val)
+            entry[val] = MODELADMIN_REVERSE % urlparts
+        # require their permissions to be checked.
+        for val in ('add', 'change', 'delete'):
+            perm = getattr(model_admin, PERMISSION_ATTRIBUTE % val)
+            urlparts.update(view=val)
+            with instrumentation.timer('permissions'):
+                permitted = perm(self.request)
+            if permitted:
+                urlname = MODELADMIN_REVERSE % urlparts
+                entry.update({
+                    val: urlname,
+                    '%s_link' % val: _admin_link_shortcut(urlname)
+                })
+        return entry
+
+    def get_permitted_pks(self, key, objs, view):
+        """
+        Asks the :class:`~django.contrib.admin.ModelAdmin` registered for `key`
+        which of `objs` the user may use `view` for, using
+        :meth:`~adminlinks.admin.AdminlinksMixin.get_permitted_objects` for
+        all of them at once. Answers are remembered for the rest of the
+        request, so only objects not seen before are asked about.
+
+        .. versionadded:: 0.9.0
+
+        :param key: the model, as given by
+                    :func:`~adminlinks.templatetags.utils._get_model_key`
+        :param objs: instances of the model.
+        :param view: any key of
+                     :data:`~adminlinks.constants.OBJECT_PERMISSIONS`
+        :return: the primary keys of the permitted objects, or :data:`None` if
+                 the :class:`~django.contrib.admin.ModelAdmin` only has
+                 permissions for the whole model (including when
+                 ``get_permitted_objects`` returns :data:`None`).
+        :rtype: :data:`set` or :data:`None`
+        """
+        found = self.registry.get(key)
+        if found is None:
+            return set()
+        hook = getattr(found[1], 'get_permitted_objects', None)
+        if hook is None:
+            return None
+        action = OBJECT_PERMISSIONS[view]
+        known = self._object_perms.setdefault((key, action), {})
+        if known is None:
+            return None
+        unknown = {}
+        for obj in objs:
+            if obj.pk not in known:
+                unknown.setdefault(obj.pk, obj)
+        if unknown:
+            with instrumentation.timer('permissions'):
+                permitted = hook(self.request, list(unknown.values()), action)
+            if permitted is None:
+                # the model's permissions apply, so don't ask again.
+                self._object_perms[(key, action)] = None
+                return None
+            permitted = set(getattr(item, 'pk', item) for item in permitted)
+            for pk in unknown:
+                known[pk] = pk in permitted
+        return set(obj.pk for obj in objs if known[obj.pk])
+
+    def has_object_permission(self, key, obj, view):
+        """
+        Like :meth:`~adminlinks.templatetags.utils.ModelAdminIndex.get_permitted_pks`
+        for a single object.
+
+        .. versionadded:: 0.9.0
+
+        :return: whether `view` may be used for `obj`; always :data:`True` if
+                 the :class:`~django.contrib.admin.ModelAdmin` only has
+                 permissions for the whole model.
+        :rtype: :data:`boolean`
+        """
+        permitted = self.get_permitted_pks(key, [obj], view)
+        return permitted is None or obj.pk in permitted
+
+    def get(self, key, default=None):
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            found = self.registry.get(key)
+            entry = None
+            if found is not None:
+                entry = self.build_entry(*found)
+            self._entries[key] = entry
+        if entry is None:
+            return default
+        return entry
+
+    def __getitem__(self, key):
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def as_dict(self):
+        """
+        Forces every entry to be computed.
+
+        :return: visible :class:`~django.contrib.admin.ModelAdmin` classes.
+        :rtype: :data:`dictionary`
+        """
+        instrumentation.incr('registry_walks')
+        return dict((key, self[key]) for key in self.registry if key in self)
+
+
+def get_modeladmin_index(request, admin_site):
+    """
+    Finds (or creates) the
+    :class:`~adminlinks.templatetags.utils.ModelAdminIndex` for this request
+    and admin site. The index is stored on the request, so every template tag
+    rendered while handling it shares the work.
+
+    .. versionadded:: 0.9.0
+
+    :param request: the current request, for permissions checking etc.
+    :param admin_site: a concrete :class:`~django.contrib.admin.AdminSite`
+                       named and mounted on the project.
+    :rtype: :class:`~adminlinks.templatetags.utils.ModelAdminIndex`
+    """
+    indexes = getattr(request, '_adminlinks_indexes', None)
+    if indexes is None:
+        indexes = {}
+        request._adminlinks_indexes = indexes
+    index = indexes.get(admin_site)
+    # the user may have changed (signed in or out) part way through the
+    # request, in which case the permissions already checked are useless.
+    if index is None or index.user is not getattr(request, 'user', None):
+        index = ModelAdminIndex(request=request, admin_site=admin_site)
+        indexes[admin_site] = index
+    return index
 
 
 def get_registered_modeladmins(request, admin_site):
@@ -125,58 +421,161 @@ def get_registered_modeladmins(request, admin_site):
 
     Always returns a dictionary, though it may be empty, and thus evaluate as Falsy.
 
+    .. versionchanged:: 0.9.0
+        the permission checks are shared with every other template tag
+        rendered during the request, via
+        :func:`~adminlinks.templatetags.utils.get_modeladmin_index`
+
     :param request: the current request, for permissions checking etc.
     :param admin_site: a concrete :class:`~django.contrib.admin.AdminSite`
                        named and mounted on the project.
     :return: visible :class:`~django.contrib.admin.ModelAdmin` classes.
     :rtype: :data:`dictionary`
     """
-    apps = defaultdict(dict)
+    return get_modeladmin_index(request, admin_site).as_dict()
 
-    for model, model_admin in admin_site._registry.items():
-        app_key = model._meta.app_label
-        if hasattr(model._meta, 'model_name'):
-            model_key = model._meta.model_name
-        else:
-            model_key = model._meta.module_name
-        dict_key = (app_key.lower(), model_key.lower())
-
-        if request.user.has_module_perms(app_key):
-            # TODO: if a model has parents, use get_parent_list on the Options
-            # instance to test all base permissions.
-            urlparts = {
-                'namespace': admin_site.name,
-                'app': app_key,
-                'module': model_key,
-            }
 
-            apps[dict_key].update(name=model._meta.verbose_name)
+def _get_urlconf_cache(store):
+    """
+    Finds the cache within `store` for the URLconf active in this thread.
 
-            for val in ('history', 'changelist'):
-                urlparts.update(view=val)
-                apps[dict_key].update({
-                    val: MODELADMIN_REVERSE % urlparts,
-                })
-            # require their permissions to be checked.
-            for val in ('add', 'change', 'delete'):
-                perm = getattr(model_admin, PERMISSION_ATTRIBUTE % val)
-                urlparts.update(view=val)
-                if perm(request):
-                    urlname = MODELADMIN_REVERSE % urlparts
-                    apps[dict_key].update({
-                        val: urlname,
-                        '%s_link' % val: _admin_link_shortcut(urlname)
-                    })
-    app_dict = dict(apps)
-    return app_dict
+    The cache is thrown away whenever the resolver for that URLconf is rebuilt
+    (eg: by :func:`~django.core.urlresolvers.clear_url_caches`), so nothing
+    outlives the url patterns it was computed from.
 
+    .. versionadded:: 0.9.0
 
-def _admin_link_shortcut(urlname, params=None, query=None):
+    :param store: a module level dictionary, which is keyed by URLconf.
+    :return: a dictionary which may be used as a cache.
+    :rtype: :data:`dictionary`
+    """
+    urlconf = get_urlconf()
+    resolver = get_resolver(urlconf)
+    cached_resolver, cache = store.get(urlconf, (None, None))
+    if cached_resolver is not resolver:
+        cache = {}
+        store[urlconf] = (resolver, cache)
+    return cache
+
+
+@receiver(setting_changed)
+def _clear_urlconf_caches(sender, setting, **kwargs):
+    """
+    Changing `ROOT_URLCONF` doesn't necessarily rebuild the resolver that
+    :func:`~adminlinks.templatetags.utils._get_urlconf_cache` watches, so
+    everything is discarded here instead.
+
+    .. versionadded:: 0.9.0
+    """
+    if setting == 'ROOT_URLCONF':
+        _url_templates_cache.clear()
+        _admin_sites_cache.clear()
+
+
+def _reverse(*args, **kwargs):
+    """
+    :func:`~django.core.urlresolvers.reverse`, counted and timed by
+    :mod:`~adminlinks.instrumentation` when collecting.
+
+    .. versionadded:: 0.9.0
+    """
+    with instrumentation.timer('reverse'):
+        return reverse(*args, **kwargs)
+
+
+def _compile_url_template(urlname, arg_count):
+    """
+    Reverses `urlname` using placeholder arguments and splits the result
+    around them, so that later links can be built by joining the pieces
+    back together with the real arguments.
+
+    Two different sets of placeholders (letters, and digits) are used, and
+    both must produce the same url, so that a url pattern which only accepts
+    certain characters (eg: ``[0-9]+``) isn't compiled at all.
+
+    .. versionadded:: 0.9.0
+
+    :param urlname: the view, or named URL to be reversed
+    :param arg_count: how many positional `args` the url requires.
+    :return: the literal parts of the url either side of each argument,
+             or :data:`None` if the url cannot be compiled.
+    :rtype: :data:`list` or :data:`None`
+    """
+    letters = ['adminlinks%dprobe' % index for index in range(arg_count)]
+    digits = ['9%d9' % index for index in range(arg_count)]
+    try:
+        url = _reverse(urlname, args=letters)
+        parts = []
+        remaining = url
+        for probe in letters:
+            if url.count(probe) != 1:
+                return None
+            before, probe, remaining = remaining.partition(probe)
+            parts.append(before)
+        parts.append(remaining)
+        if _reverse(urlname, args=digits) != _join_url_template(parts, digits):
+            return None
+    except NoReverseMatch:
+        return None
+    return parts
+
+
+def _join_url_template(parts, params):
+    """
+    The inverse of :func:`~adminlinks.templatetags.utils._compile_url_template`
+
+    .. versionadded:: 0.9.0
+    """
+    url = [parts[0]]
+    for param, part in zip(params, parts[1:]):
+        url.extend((param, part))
+    return ''.join(url)
+
+
+def _reverse_admin_url(urlname, params=None):
+    """
+    Like :func:`~django.core.urlresolvers.reverse`, but compiles the url into a
+    template the first time it's seen, so every subsequent call only needs to
+    put the arguments into place.
+
+    Falls back to :func:`~django.core.urlresolvers.reverse` for any arguments
+    which would need quoting, and for url patterns which can't be compiled.
+
+    .. versionadded:: 0.9.0
+
+    :param urlname: the view, or named URL to be reversed
+    :param params: any parameters (as `args`, not `kwargs`) required to create
+                   the correct URL.
+    :return: the URL discovered
+    :rtype: unicode string
+    :raises: :exc:`~django.core.urlresolvers.NoReverseMatch`
+    """
+    params = [force_text(param) for param in params or ()]
+    if all(_TEMPLATABLE_URL_ARG.match(param) for param in params):
+        templates = _get_urlconf_cache(_url_templates_cache)
+        # the script prefix and language may both be different per-request,
+        # and both can change the url generated.
+        key = (urlname, len(params), get_script_prefix(), get_language())
+        if key not in templates:
+            templates[key] = _compile_url_template(urlname, len(params))
+        parts = templates[key]
+        if parts is not None:
+            return _join_url_template(parts, params)
+    return _reverse(urlname, args=params)
+
+
+def _resolve_admin_link(urlname, params=None, query=None):
     """
     Minor wrapper around :func:`~django.core.urlresolvers.reverse`, catching the
     :exc:`~django.core.urlresolvers.NoReverseMatch` that may be thrown, and
     instead returning an empty unicode string.
 
+    .. versionchanged:: 0.9.0
+        urls are built from a compiled template where possible; see
+        :func:`~adminlinks.templatetags.utils._reverse_admin_url`. Previously
+        this was :func:`~adminlinks.templatetags.utils._admin_link_shortcut`,
+        which now defers to this.
+
     :param urlname: the view, or named URL to be reversed
     :param params: any parameters (as `args`, not `kwargs`) required to create
                    the correct URL.
@@ -184,11 +583,13 @@ def _admin_link_shortcut(urlname, params=None, query=None):
     :rtype: unicode string
     """
     try:
-        params = params or ()
-        url = reverse(urlname, args=params)
+        url = _reverse_admin_url(urlname, params)
     except NoReverseMatch:
         return ''
 
+    if not query and '?' not in url:
+        return url
+
     scheme, netloc, path, query2, frag = urlsplit(url, allow_fragments=False)
     existing_qs = QueryDict(query_string=query2, mutable=True)
     new_qs = QueryDict(query_string=query or '')
@@ -197,8 +598,94 @@ def _admin_link_shortcut(urlname, params=None, query=None):
     return final_url
 
 
+class LazyLink(object):
+    """
+    A url which isn't worked out until it's needed; that is, when it's
+    rendered as a string, or tested for truthiness (eg: ``{% if link %}``).
+    Once resolved, the url is kept, so it's only ever done once.
+
+    Links which a template never outputs therefore cost almost nothing.
+
+    .. versionadded:: 0.9.0
+    """
+    __slots__ = ('_func', '_args', '_value')
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+        self._value = None
+
+    def resolve(self):
+        """
+        :return: the url, or an empty string.
+        :rtype: unicode string
+        """
+        if self._func is not None:
+            self._value = self._func(*self._args)
+            self._func = self._args = None
+        return self._value
+
+    if sys.version_info[0] >= 3:
+        def __str__(self):
+            return self.resolve()
+    else:
+        def __unicode__(self):
+            return self.resolve()
+
+        def __str__(self):
+            return self.resolve().encode('utf-8')
+
+    def __bool__(self):
+        return bool(self.resolve())
+    __nonzero__ = __bool__
+
+    def __len__(self):
+        return len(self.resolve())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyLink):
+            other = other.resolve()
+        return self.resolve() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.resolve())
+
+    def __repr__(self):
+        if self._func is not None:
+            return '<LazyLink: unresolved>'
+        return '<LazyLink: %r>' % self._value
+
+
+def _admin_link_shortcut(urlname, params=None, query=None):
+    """
+    Defers the work of
+    :func:`~adminlinks.templatetags.utils._resolve_admin_link` until the link
+    is actually used.
+
+    .. versionchanged:: 0.9.0
+        returns a :class:`~adminlinks.templatetags.utils.LazyLink` rather
+        than the url itself.
+
+    :param urlname: the view, or named URL to be reversed
+    :param params: any parameters (as `args`, not `kwargs`) required to create
+                   the correct URL.
+    :return: the URL discovered, or an empty string, when resolved.
+    :rtype: :class:`~adminlinks.templatetags.utils.LazyLink`
+    """
+    return LazyLink(_resolve_admin_link, urlname, params, query)
+
+
+def _has_object_permission(admins, lookup, obj, permname):
+    if obj is None or permname not in OBJECT_PERMISSIONS:
+        return True
+    return admins.has_object_permission(lookup, obj, permname)
+
+
 def _add_link_to_context(admin_site, request, opts, permname, url_params,
-                         query=None):
+                         query=None, obj=None):
     """
     Find out if a model is in our known list and at has least 1 permission.
     If it's in there, try and reverse the URL to return a dictionary for the
@@ -214,6 +701,9 @@ def _add_link_to_context(admin_site, request, opts, permname, url_params,
     :param url_params: a list of items to be passed as `args` to the underlying
                        use of reverse.
     :param query: querystring to append.
+    :param obj: the instance being linked to, whose object-level permissions
+                are checked if the :class:`~django.contrib.admin.ModelAdmin`
+                has a ``get_permitted_objects`` method.
     :return: a dictionary containing `link` and `verbose_name` keys, whose values
              are the reversed URL and the display name of the object. Both may
              be blank.
@@ -221,15 +711,11 @@ def _add_link_to_context(admin_site, request, opts, permname, url_params,
     """
     site = get_admin_site(admin_site)
     if site is not None:
-        admins = get_registered_modeladmins(request, site)
-        app_lookup = opts.app_label
-        if hasattr(opts, 'model_name'):
-            model_lookup = opts.model_name
-        else:
-            model_lookup = opts.module_name
-        lookup = (app_lookup.lower(), model_lookup.lower())
-
-        if lookup in admins.keys() and permname in admins[lookup]:
+        admins = get_modeladmin_index(request, site)
+        lookup = _get_model_key(opts)
+
+        if (lookup in admins and permname in admins[lookup]
+                and _has_object_permission(admins, lookup, obj, permname)):
             link = _admin_link_shortcut(admins[lookup][permname], url_params, query)
             return {'link': link, 'verbose_name': opts.verbose_name}
 
@@ -237,7 +723,7 @@ def _add_link_to_context(admin_site, request, opts, permname, url_params,
 
 
 def _add_custom_link_to_context(admin_site, request, opts, permname, viewname,
-                                url_params, query=None):
+                                url_params, query=None, obj=None):
     """
     Like :func:`~adminlinks.templatetags.utils._add_link_to_context`, but allows
     for using a specific named permission, and  any named url on the modeladmin,
@@ -257,6 +743,9 @@ def _add_custom_link_to_context(admin_site, request, opts, permname, viewname,
     :param url_params: a list of items to be passed as `args` to the underlying
                        use of reverse.
     :param query: querystring to append.
+    :param obj: the instance being linked to, whose object-level permissions
+                are checked if the :class:`~django.contrib.admin.ModelAdmin`
+                has a ``get_permitted_objects`` method.
     :return: a dictionary containing `link` and `verbose_name` keys, whose values
              are the reversed URL and the display name of the object. Both may
              be blank.
@@ -264,15 +753,11 @@ def _add_custom_link_to_context(admin_site, request, opts, permname, viewname,
     """
     site = get_admin_site(admin_site)
     if site is not None:
-        admins = get_registered_modeladmins(request, site)
-        app_lookup = opts.app_label
-        if hasattr(opts, 'model_name'):
-            model_lookup = opts.model_name
-        else:
-            model_lookup = opts.module_name
-        lookup = (app_lookup.lower(), model_lookup.lower())
-
-        if lookup in admins and permname in admins[lookup]:
+        admins = get_modeladmin_index(request, site)
+        lookup = _get_model_key(opts)
+
+        if (lookup in admins and permname in admins[lookup]
+                and _has_object_permission(admins, lookup, obj, permname)):
             return {
                 'link': _admin_link_shortcut(MODELADMIN_REVERSE % {
                     'namespace': site.name,
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for testing projects which use `django-adminlinks`.
+
+.. versionadded:: 0.9.0
+"""
+import re
+from django.test.client import Client
+try:
+    from django.utils.encoding import force_text
+except ImportError:  # < Django 1.5
+    from django.utils.encoding import force_unicode as force_text
+
+ESI_INCLUDE = re.compile(r'<esi:include\s+src="([^"]*)"\s*/>')
+
+
+class ESIClient(Client):
+    """
+    A :class:`~django.test.client.Client` which behaves like a proxy
+    supporting `Edge Side Includes`_, for testing the **"esi"** output mode
+    without one::
+
+        client = ESIClient()
+        client.login(username='editor', password='...')
+        response = client.get('/a/cached/page/')
+        # every <esi:include> has been replaced with its fragment.
+
+    Each include is fetched with the same client, and so the same cookies, as
+    the original request. Fragments which don't respond with a **200** are
+    replaced with nothing, which is how `Varnish`_ treats them.
+
+    .. _Edge Side Includes: http://www.w3.org/TR/esi-lang
+    .. _Varnish: https://www.varnish-cache.org/
+    """
+    #: how deeply includes may be nested inside fragments.
+    max_depth = 3
+
+    def __init__(self, *args, **kwargs):
+        super(ESIClient, self).__init__(*args, **kwargs)
+        self._esi_depth = 0
+
+    def request(self, **request):
+        response = super(ESIClient, self).request(**request)
+        if (self._esi_depth >= self.max_depth
+                or getattr(response, 'streaming', False)
+                or not response.get('Content-Type', '').startswith('text/html')):
+            return response
+        self._esi_depth += 1
+        try:
+            response.content = self.expand_esi(force_text(response.content))
+        finally:
+            self._esi_depth -= 1
+        return response
+
+    def expand_esi(self, content):
+        """
+        :return: the content, with every ``<esi:include>`` replaced.
+        """
+        def include(match):
+            fragment = self.get(match.group(1))
+            if fragment.status_code != 200:
+                return ''
+            return force_text(fragment.content)
+        return ESI_INCLUDE.sub(include, content)
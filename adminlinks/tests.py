@@ -3,8 +3,9 @@ from django.template import TemplateDoesNotExist, TemplateSyntaxError
 from django.template.context import Context, RequestContext
 from django.core.urlresolvers import reverse, NoReverseMatch
 from django.http import HttpRequest
-from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser, User
 from django.conf import settings
+import json
 from django.contrib import admin
 
 try:
@@ -158,3 +159,1297 @@ class AdminSingleObjectTestCase(SingleObjectTestBase, unittest.TestCase):
         self.with_specified_bad_template('history')
         self.with_specified_bad_template('delete')
 
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def test_nothing_collected_by_default(self):
+        '''Outside of collect(), counters are ignored entirely'''
+        from adminlinks.instrumentation import get_stats, incr
+        incr('reverse')
+        self.assertEqual(get_stats(), None)
+
+    def test_collect_counts_and_times(self):
+        '''Counters and timers are gathered inside collect()'''
+        from adminlinks.instrumentation import collect, incr, timer
+        with collect() as stats:
+            incr('registry_walks')
+            incr('registry_walks')
+            with timer('reverse'):
+                pass
+        data = stats.as_dict()
+        self.assertEqual(data['registry_walks']['count'], 2)
+        self.assertEqual(data['registry_walks']['time'], 0.0)
+        self.assertEqual(data['reverse']['count'], 1)
+
+    def test_panel_records_stats(self):
+        '''The debug toolbar panel splits counters from template tags'''
+        from adminlinks.instrumentation import Stats
+        from adminlinks.panels import AdminlinksPanel
+        stats = Stats()
+        stats.incr('reverse', 3)
+        stats.add_time('tags', 0.5)
+        stats.add_time('tag.Edit', 0.5)
+        request = HttpRequest()
+        request.adminlinks_stats = stats
+        panel = AdminlinksPanel.__new__(AdminlinksPanel)
+        recorded = {}
+        panel.record_stats = recorded.update
+        panel.process_response(request, None)
+        self.assertEqual(recorded['tag_count'], 1)
+        self.assertEqual(recorded['reverse_count'], 3)
+        self.assertEqual([row[0] for row in recorded['tags']], ['tag.Edit'])
+        self.assertEqual([row[0] for row in recorded['counters']],
+                         ['reverse', 'tags'])
+
+
+class ESIClientTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test.utils import override_settings
+        settings_override = override_settings(ROOT_URLCONF='adminlinks.tests')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.superuser = User.objects.get_or_create(
+            username='adminlinks_esi', is_staff=True, is_superuser=True)[0]
+        self.superuser.set_password('esi')
+        self.superuser.save()
+        self.page = '/esi/%d/' % self.superuser.pk
+
+    def client(self, username=None):
+        from adminlinks.testing import ESIClient
+        client = ESIClient()
+        if username is not None:
+            self.assertTrue(client.login(username=username, password='esi'))
+        return client
+
+    def test_page_is_the_same_for_everyone(self):
+        '''Without a proxy, everyone gets the same includes'''
+        from django.test.client import Client
+        anonymous = Client().get(self.page).content
+        client = Client()
+        client.login(username='adminlinks_esi', password='esi')
+        self.assertEqual(client.get(self.page).content, anonymous)
+        self.assertTrue('<esi:include src="/admin/adminlinks/fragment/?'
+                        in anonymous)
+
+    def test_includes_are_expanded(self):
+        '''Each <esi:include> is fetched for the user, and replaced'''
+        content = self.client('adminlinks_esi').get(self.page).content
+        self.assertFalse('esi:include' in content)
+        self.assertTrue(reverse('admin:auth_user_change',
+                                args=[self.superuser.pk]) in content)
+
+    def test_fragments_check_permissions(self):
+        '''Users who may not change the object get nothing'''
+        staff = User.objects.get_or_create(username='adminlinks_esi_staff',
+                                           is_staff=True)[0]
+        staff.set_password('esi')
+        staff.save()
+        for client in (self.client(), self.client('adminlinks_esi_staff')):
+            self.assertEqual(''.join(client.get(self.page).content.split()),
+                             '[]')
+
+    def test_fragment_varies_by_cookie(self):
+        '''Fragments are never cached, and vary by the user's cookies'''
+        import re
+        from django.test.client import Client
+        src = re.search(r'src="([^"]+)"', Client().get(self.page).content)
+        response = self.client('adminlinks_esi').get(src.group(1))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue('Cookie' in response['Vary'])
+        self.assertTrue('max-age=0' in response['Cache-Control'])
+
+
+class PatchedChangeListTestCase(unittest.TestCase):
+    def test_patched_class_is_reused(self):
+        '''Custom changelists are only patched, and warned about, once'''
+        import logging
+        from django.contrib.admin.views.main import ChangeList
+        from adminlinks.admin import AdminlinksMixin
+        from adminlinks.changelist import AdminlinksChangeList
+
+        class CustomChangeList(ChangeList):
+            pass
+
+        class BaseAdmin(object):
+            def get_changelist(self, request, **kwargs):
+                return CustomChangeList
+
+        class TestAdmin(AdminlinksMixin, BaseAdmin):
+            pass
+
+        warnings = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                warnings.append(record)
+
+        handler = Handler()
+        logger = logging.getLogger('adminlinks.admin')
+        logger.addHandler(handler)
+        try:
+            first = TestAdmin().get_changelist(HttpRequest())
+            second = TestAdmin().get_changelist(HttpRequest())
+        finally:
+            logger.removeHandler(handler)
+        self.assertTrue(first is second)
+        self.assertTrue(issubclass(first, AdminlinksChangeList))
+        self.assertTrue(issubclass(first, CustomChangeList))
+        self.assertEqual(len(warnings), 1)
+
+
+def _staff_request(username, **flags):
+    """
+    A request from a staff member, who is created if necessary.
+    """
+    defaults = dict({'is_staff': True, 'is_active': True}, **flags)
+    user = User.objects.get_or_create(username=username, defaults=defaults)[0]
+    request = HttpRequest()
+    request.user = user
+    return request
+
+
+class ModelAdminIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        checked = self.checked = []
+
+        class CountingAdmin(admin.ModelAdmin):
+            def has_add_permission(self, request):
+                checked.append((self.model, 'add'))
+                return True
+
+            def has_change_permission(self, request, obj=None):
+                checked.append((self.model, 'change'))
+                return True
+
+            def has_delete_permission(self, request, obj=None):
+                checked.append((self.model, 'delete'))
+                return False
+
+        from django.contrib.auth.models import Group
+        self.site = admin.AdminSite(name='adminlinks_index')
+        self.site.register(User, CountingAdmin)
+        self.site.register(Group, CountingAdmin)
+        self.request = _staff_request('adminlinks_index', is_superuser=True)
+
+    def test_shared_for_the_request(self):
+        '''Every tag rendered for a request and site shares one index'''
+        from adminlinks.templatetags.utils import get_modeladmin_index
+        index = get_modeladmin_index(self.request, self.site)
+        self.assertTrue(get_modeladmin_index(self.request, self.site) is index)
+        self.assertFalse(get_modeladmin_index(self.request, admin.site) is index)
+        self.assertFalse(get_modeladmin_index(HttpRequest(), self.site) is index)
+
+    def test_discarded_when_the_user_changes(self):
+        '''Signing in or out part way through a request starts again'''
+        from adminlinks.templatetags.utils import get_modeladmin_index
+        index = get_modeladmin_index(self.request, self.site)
+        self.request.user = _staff_request('adminlinks_index2').user
+        self.assertFalse(get_modeladmin_index(self.request, self.site) is index)
+
+    def test_only_requested_models_are_checked(self):
+        '''Permissions are tested once, for only the models asked about'''
+        from adminlinks.templatetags.utils import get_modeladmin_index
+        index = get_modeladmin_index(self.request, self.site)
+        self.assertEqual(self.checked, [])
+        entry = index[('auth', 'user')]
+        self.assertEqual(sorted(self.checked), [(User, 'add'), (User, 'change'),
+                                                (User, 'delete')])
+        self.assertEqual(entry['change'], 'adminlinks_index:auth_user_change')
+        self.assertFalse('delete' in entry)
+        index.get(('auth', 'user'))
+        self.assertTrue(('auth', 'user') in index)
+        self.assertEqual(len(self.checked), 3)
+        self.assertEqual(index.get(('auth', 'missing'), 'nope'), 'nope')
+        self.assertEqual(sorted(index.as_dict()), [('auth', 'group'),
+                                                   ('auth', 'user')])
+        self.assertEqual(len(self.checked), 6)
+
+
+class UrlTemplateTestCase(unittest.TestCase):
+    def test_same_as_reverse(self):
+        '''Urls built from a template are the ones reverse() would give'''
+        from adminlinks.templatetags.utils import _reverse_admin_url
+        for args in ([1], ['abc'], ['a_b'], ['a b'], [u'caf\xe9'],
+                     ['a/b'], []):
+            for urlname in ('admin:auth_user_change', 'admin:auth_user_history',
+                            'admin:auth_user_changelist', 'admin:index'):
+                try:
+                    expected = reverse(urlname, args=args)
+                except NoReverseMatch:
+                    self.assertRaises(NoReverseMatch, _reverse_admin_url,
+                                      urlname, args)
+                else:
+                    self.assertEqual(_reverse_admin_url(urlname, args),
+                                     expected)
+
+    def test_trailing_newline_is_not_templated(self):
+        '''Arguments must match the pattern entirely, like reverse() checks'''
+        from adminlinks.templatetags.utils import (_TEMPLATABLE_URL_ARG,
+                                                   _reverse_admin_url)
+        self.assertEqual(_TEMPLATABLE_URL_ARG.match('1\n'), None)
+        self.assertRaises(NoReverseMatch, reverse, 'admin:auth_user_change',
+                          args=['1\n'])
+        self.assertRaises(NoReverseMatch, _reverse_admin_url,
+                          'admin:auth_user_change', ['1\n'])
+
+
+class AdminSiteLookupTestCase(unittest.TestCase):
+    def setUp(self):
+        from adminlinks.templatetags import utils
+        self.utils = utils
+        self.lookups = []
+        original = utils._get_admin_site
+
+        def counting(name):
+            self.lookups.append(name)
+            return original(name)
+        utils._get_admin_site = counting
+        self.addCleanup(setattr, utils, '_get_admin_site', original)
+        utils._admin_sites_cache.clear()
+
+    def test_found_and_missing_sites_are_remembered(self):
+        '''Each name is only looked up once, whether it's mounted or not'''
+        import logging
+        logger = logging.getLogger('adminlinks.templatetags.utils')
+        logger.disabled = True
+        self.addCleanup(setattr, logger, 'disabled', False)
+        for attempt in range(3):
+            self.assertTrue(self.utils.get_admin_site('admin') is admin.site)
+            self.assertEqual(self.utils.get_admin_site('adminlinks_missing'),
+                             None)
+        self.assertEqual(self.lookups, ['admin', 'adminlinks_missing'])
+
+    def test_forgotten_when_the_urlconf_is_rebuilt(self):
+        '''Clearing the url caches discards the sites found'''
+        from django.core.urlresolvers import clear_url_caches
+        self.utils.get_admin_site('admin')
+        clear_url_caches()
+        self.utils.get_admin_site('admin')
+        self.assertEqual(self.lookups, ['admin', 'admin'])
+
+
+class PermissionSnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import Group, Permission
+        from django.test.utils import override_settings
+        settings_override = override_settings(
+            CACHES={'adminlinks_tests': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'adminlinks_tests'}},
+            ADMINLINKS_PERMISSION_CACHE='adminlinks_tests')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        from adminlinks.permissions import get_permissions_cache
+        self.cache = get_permissions_cache()
+        self.cache.clear()
+        self.user = User.objects.get_or_create(username='adminlinks_snapshot',
+                                               is_staff=True)[0]
+        self.user.groups.clear()
+        self.user.user_permissions.clear()
+        self.group = Group.objects.get_or_create(name='adminlinks_snapshot')[0]
+        self.group.permissions = Permission.objects.filter(
+            content_type__app_label='auth', codename='change_group')
+
+    def fresh_user(self, fail=False):
+        user = User.objects.get(pk=self.user.pk)
+        if fail:
+            def get_all_permissions(obj=None):
+                raise AssertionError('permissions were not cached')
+            user.get_all_permissions = get_all_permissions
+        return user
+
+    def test_cached_between_requests(self):
+        '''A second request for the same user doesn't ask the database'''
+        from adminlinks.permissions import get_permission_snapshot
+        self.assertEqual(len(get_permission_snapshot(self.fresh_user())), 0)
+        user = self.fresh_user(fail=True)
+        snapshot = get_permission_snapshot(user)
+        self.assertEqual(len(snapshot), 0)
+        self.assertTrue(get_permission_snapshot(user) is snapshot)
+        self.assertEqual(get_permission_snapshot(AnonymousUser()), None)
+
+    def test_invalidated_by_permission_changes(self):
+        '''Joining a group, or a group's permissions changing, starts again'''
+        from django.contrib.auth.models import Permission
+        from adminlinks.permissions import get_permission_snapshot
+        get_permission_snapshot(self.fresh_user())
+        self.user.groups.add(self.group)
+        snapshot = get_permission_snapshot(self.fresh_user())
+        self.assertEqual(snapshot.permissions, frozenset(['auth.change_group']))
+        self.assertTrue(snapshot.has_module_perms(self.user, 'auth'))
+        self.assertFalse(snapshot.has_module_perms(self.user, 'sites'))
+
+        self.group.permissions.add(Permission.objects.get(
+            content_type__app_label='auth', codename='add_group'))
+        snapshot = get_permission_snapshot(self.fresh_user())
+        self.assertEqual(snapshot.permissions, frozenset(['auth.add_group',
+                                                          'auth.change_group']))
+
+    def test_stale_while_revalidating(self):
+        '''Stale snapshots are served while one request refreshes them'''
+        from django.test.utils import override_settings
+        from adminlinks.permissions import REFRESHING_KEY, _load_snapshot
+        refreshing = REFRESHING_KEY % self.user.pk
+        with override_settings(ADMINLINKS_PERMISSION_CACHE_TIMEOUT=-1):
+            _load_snapshot(self.fresh_user(), self.cache)
+            # another request is already refreshing it.
+            self.cache.add(refreshing, 1)
+            snapshot = _load_snapshot(self.fresh_user(fail=True), self.cache)
+            self.assertEqual(len(snapshot), 0)
+
+            # a new version can't be served stale, but the other request is
+            # still the one refreshing.
+            self.user.groups.add(self.group)
+            snapshot = _load_snapshot(self.fresh_user(), self.cache)
+            self.assertEqual(len(snapshot), 1)
+            self.assertEqual(self.cache.get(refreshing), 1)
+
+            # once it's done, the next request gets to refresh it.
+            self.cache.delete(refreshing)
+            snapshot = _load_snapshot(self.fresh_user(), self.cache)
+            self.assertEqual(len(snapshot), 1)
+            self.assertEqual(self.cache.get(refreshing), None)
+
+
+class AdminlinksForTestCase(unittest.TestCase):
+    def setUp(self):
+        self.request = _staff_request('adminlinks_for', is_superuser=True)
+        self.users = [self.request.user,
+                      User.objects.get_or_create(username='adminlinks_for2')[0]]
+        self.template = Template(
+            '{% load adminlinks_buttons %}{% adminlinks_for users as links %}'
+            '{% for user in users %}{% with item=links|adminlinks_get:user %}'
+            '{{ item.change }} {{ item.delete }} {{ item.history }}|'
+            '{% endwith %}{% endfor %}')
+
+    def test_links_for_every_object(self):
+        '''Each object gets the same links the admin would reverse'''
+        from adminlinks.instrumentation import collect
+        with collect() as stats:
+            result = self.template.render(RequestContext(
+                self.request, {'users': self.users}))
+        expected = ''.join('%s %s %s|' % tuple(
+            reverse('admin:auth_user_%s' % view, args=[user.pk])
+            for view in ('change', 'delete', 'history'))
+            for user in self.users)
+        self.assertEqual(result, expected)
+        # add, change and delete, for the model, rather than for every object.
+        self.assertEqual(stats.as_dict()['permissions']['count'], 3)
+
+    def test_nothing_for_visitors(self):
+        '''Users who can't use the admin get no links'''
+        self.request.user = AnonymousUser()
+        result = self.template.render(RequestContext(
+            self.request, {'users': self.users}))
+        self.assertEqual(result, '  |  |')
+
+
+class LazyLinkTestCase(unittest.TestCase):
+    def test_only_reversed_when_used(self):
+        '''Links cost nothing until rendered, and are only reversed once'''
+        from adminlinks.instrumentation import collect
+        from adminlinks.templatetags.utils import (LazyLink,
+                                                   _admin_link_shortcut)
+        with collect() as stats:
+            link = _admin_link_shortcut('admin:auth_user_change', [1], 'a=1')
+            self.assertTrue(isinstance(link, LazyLink))
+            self.assertEqual(repr(link), '<LazyLink: unresolved>')
+            self.assertEqual(stats.as_dict().get('reverse'), None)
+            expected = reverse('admin:auth_user_change', args=[1]) + '?a=1'
+            self.assertEqual(Template('{{ link }}').render(Context(
+                {'link': link})), expected)
+            self.assertTrue(link)
+            self.assertEqual(link, expected)
+            self.assertEqual(len(link), len(expected))
+            self.assertNotEqual(repr(link), '<LazyLink: unresolved>')
+            reversed_count = stats.as_dict().get('reverse')
+            self.assertEqual(unicode(link), expected)
+            self.assertEqual(stats.as_dict().get('reverse'), reversed_count)
+
+    def test_missing_urls_are_empty(self):
+        '''Links which can't be reversed are falsy'''
+        from adminlinks.templatetags.utils import _admin_link_shortcut
+        link = _admin_link_shortcut('admin:adminlinks_missing')
+        self.assertFalse(link)
+        self.assertEqual(Template('{% if link %}yes{% endif %}').render(
+            Context({'link': link})), '')
+
+
+def _locmem_cache_settings(**kwargs):
+    """
+    Settings for a local memory cache named ``adminlinks_tests``, to be used
+    by whichever of adminlinks' caches are named in `kwargs`.
+    """
+    from django.test.utils import override_settings
+    return override_settings(CACHES={'adminlinks_tests': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'adminlinks_tests'}}, **kwargs)
+
+
+class ToolbarCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import Permission
+        settings_override = _locmem_cache_settings(
+            ADMINLINKS_TOOLBAR_CACHE='adminlinks_tests')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        from adminlinks.permissions import get_cache
+        self.cache = get_cache('adminlinks_tests')
+        self.cache.clear()
+        self.requests = {}
+        for name in ('add_user', 'add_group'):
+            request = _staff_request('adminlinks_toolbar_%s' % name)
+            request.user.user_permissions = Permission.objects.filter(
+                content_type__app_label='auth', codename=name)
+            self.requests[name] = request
+        self.template = Template('{% load adminlinks_toolbar %}'
+                                 '{% render_adminlinks_toolbar %}')
+
+    def render(self, name):
+        request = self.requests[name]
+        # a new user, so nothing is remembered between renders.
+        request.user = User.objects.get(pk=request.user.pk)
+        return self.template.render(RequestContext(request))
+
+    def cached(self):
+        return sorted(self.cache._cache)
+
+    def test_users_with_different_permissions(self):
+        '''Each set of permissions has its own toolbar'''
+        user_add = reverse('admin:auth_user_add')
+        group_add = reverse('admin:auth_group_add')
+        first = self.render('add_user')
+        second = self.render('add_group')
+        self.assertTrue(user_add in first and group_add not in first)
+        self.assertTrue(group_add in second and user_add not in second)
+        self.assertEqual(len(self.cached()), 2)
+        self.assertEqual(self.render('add_user'), first)
+        self.assertEqual(len(self.cached()), 2)
+
+    def test_shared_by_users_with_the_same_permissions(self):
+        '''Users with the same permissions get the same cached toolbar'''
+        self.render('add_user')
+        other = _staff_request('adminlinks_toolbar_other')
+        other.user.user_permissions = self.requests['add_user'].user.user_permissions.all()
+        self.requests['other'] = other
+        self.render('other')
+        self.assertEqual(len(self.cached()), 1)
+
+    def test_registry_and_language_changes(self):
+        '''Registering another model, or changing language, misses the cache'''
+        from django.contrib.auth.models import Permission
+        from django.utils import translation
+        self.render('add_user')
+        keys = self.cached()
+        admin.site.register(Permission)
+        try:
+            self.render('add_user')
+        finally:
+            admin.site.unregister(Permission)
+        self.assertEqual(len(self.cached()), 2)
+        self.render('add_user')
+        self.assertEqual(len(self.cached()), 2)
+        translation.activate('de')
+        try:
+            self.render('add_user')
+        finally:
+            translation.deactivate()
+        self.assertEqual(len(self.cached()), 3)
+        self.assertTrue(keys[0] in self.cached())
+
+
+class ServerTimingTestCase(unittest.TestCase):
+    def respond(self, request):
+        from django.http import HttpResponse
+        from adminlinks.instrumentation import incr, timer
+        from adminlinks.middleware import ServerTimingMiddleware
+        middleware = ServerTimingMiddleware()
+        middleware.process_request(request)
+        with timer('tags'):
+            incr('reverse')
+        response = HttpResponse('')
+        response['Server-Timing'] = 'db;dur=1'
+        return middleware.process_response(request, response)
+
+    def test_header(self):
+        '''Staff members get the timings, after any already there'''
+        from django.test.utils import override_settings
+        with override_settings(ADMINLINKS_SERVER_TIMING=True):
+            response = self.respond(_staff_request('adminlinks_timing'))
+        metrics = response['Server-Timing'].split(', ')
+        self.assertEqual(len(metrics), 3)
+        self.assertEqual(metrics[0], 'db;dur=1')
+        self.assertTrue(metrics[1].startswith('adminlinks-tags;dur='))
+        self.assertTrue(metrics[1].endswith(';desc="adminlinks tags (1)"'))
+        self.assertEqual(metrics[2], 'adminlinks-reverse;dur=0.000;'
+                                     'desc="adminlinks reverse (1)"')
+        from adminlinks.instrumentation import get_stats
+        self.assertEqual(get_stats(), None)
+
+    def test_gated(self):
+        '''Nothing is collected unless enabled, and only for staff'''
+        from django.test.utils import override_settings
+        response = self.respond(_staff_request('adminlinks_timing'))
+        self.assertEqual(response['Server-Timing'], 'db;dur=1')
+        with override_settings(ADMINLINKS_SERVER_TIMING=True):
+            for user in (AnonymousUser(), User.objects.get_or_create(
+                    username='adminlinks_timing_visitor')[0]):
+                request = HttpRequest()
+                request.user = user
+                response = self.respond(request)
+                self.assertEqual(response['Server-Timing'], 'db;dur=1')
+            response = self.respond(HttpRequest())
+            self.assertEqual(response['Server-Timing'], 'db;dur=1')
+
+
+class AdminlinksBlockTestCase(unittest.TestCase):
+    def render(self, user, **extra):
+        resolved = []
+        request = HttpRequest()
+        request.user = user
+        context = RequestContext(request, dict(
+            extra, inside=lambda: resolved.append(True) or 'inside'))
+        output = Template('{% load adminlinks_buttons %}{% adminlinks_block %}'
+                          '{{ inside }}{% endadminlinks_block %}').render(context)
+        return output, resolved
+
+    def test_skipped_for_visitors(self):
+        '''Nothing inside the block is even resolved for visitors'''
+        self.assertEqual(self.render(AnonymousUser()), ('', []))
+        user = User.objects.get_or_create(username='adminlinks_block')[0]
+        self.assertEqual(self.render(user), ('', []))
+
+    def test_rendered_for_editors(self):
+        '''Editors, and placeholders, get the contents'''
+        user = _staff_request('adminlinks_block_editor', is_superuser=True).user
+        self.assertEqual(self.render(user), ('inside', [True]))
+        self.assertEqual(self.render(AnonymousUser(),
+                                     adminlinks_output_mode='placeholder'),
+                         ('inside', [True]))
+
+
+class PlaceholdersViewTestCase(unittest.TestCase):
+    def setUp(self):
+        from adminlinks.admin import AdminlinksSiteMixin
+
+        class PlaceholderSite(AdminlinksSiteMixin, admin.AdminSite):
+            pass
+        # the tags find the default site by name, so share its models.
+        self.site = PlaceholderSite(name=admin.site.name)
+        self.site._registry = admin.site._registry
+        self.superuser = _staff_request('adminlinks_placeholders',
+                                        is_superuser=True).user
+
+    def post(self, user, data, cookies=None):
+        from django.test.client import RequestFactory
+        request = RequestFactory().post('/', json.dumps(data),
+                                        content_type='application/json')
+        request._dont_enforce_csrf_checks = True
+        request.COOKIES.update(cookies or {})
+        request.user = user
+        return self.site.placeholders_view(request)
+
+    def placeholders(self):
+        edit = {'tag': 'render_edit_button', 'model': 'auth.user',
+                'pk': str(self.superuser.pk),
+                'arguments': {'admin_site': 'admin', 'querystring': ''}}
+        return [
+            dict(edit, id='edit'),
+            dict(edit, id='missing', pk='0'),
+            dict(edit, id='unknown_tag', tag='render_adminlinks_js'),
+            dict(edit, id='unknown_model', model='auth.nothing'),
+            dict(edit, id='other_site', arguments={'admin_site': 'other',
+                                                   'querystring': ''}),
+            dict(edit, id='bad_arguments', arguments={'admin_site': ['admin']}),
+            {'id': 'toolbar', 'tag': 'render_adminlinks_toolbar',
+             'arguments': {'with_labels': True, 'admin_site': 'admin'}},
+        ]
+
+    def test_html_for_each_valid_placeholder(self):
+        '''Only placeholders the tags could have rendered are filled in'''
+        from adminlinks.constants import EDITOR_COOKIE
+        response = self.post(self.superuser,
+                             {'placeholders': self.placeholders()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertTrue('max-age=0' in response['Cache-Control'])
+        self.assertEqual(response.cookies[EDITOR_COOKIE].value, '1')
+        html = json.loads(response.content)['html']
+        self.assertEqual(sorted(html), ['edit', 'missing', 'toolbar'])
+        self.assertTrue(reverse('admin:auth_user_change',
+                                args=[self.superuser.pk]) in html['edit'])
+        self.assertEqual(html['missing'], '')
+        self.assertTrue(reverse('admin:auth_user_add') in html['toolbar'])
+
+    def test_permissions_are_checked(self):
+        '''Users only get the links they may use'''
+        from django.contrib.auth.models import Permission
+        from adminlinks.constants import EDITOR_COOKIE
+        user = _staff_request('adminlinks_placeholders_staff').user
+        user.user_permissions = Permission.objects.filter(
+            content_type__app_label='auth', codename='add_group')
+        user = User.objects.get(pk=user.pk)
+        html = json.loads(self.post(user, {'placeholders': self.placeholders()}
+                                    ).content)['html']
+        self.assertEqual(html['edit'], '')
+        self.assertFalse(reverse('admin:auth_user_add') in html['toolbar'])
+        self.assertTrue(reverse('admin:auth_group_add') in html['toolbar'])
+
+        response = self.post(AnonymousUser(),
+                             {'placeholders': self.placeholders()},
+                             cookies={EDITOR_COOKIE: '1'})
+        self.assertEqual(json.loads(response.content), {'html': {}})
+        self.assertEqual(response.cookies[EDITOR_COOKIE]['max-age'], 0)
+
+    def test_fields_and_hidden_objects(self):
+        '''Unknown fields are ignored, and hidden objects get no links'''
+        field = {'tag': 'render_edit_field_button', 'model': 'auth.user',
+                 'pk': str(self.superuser.pk)}
+        arguments = {'admin_site': 'admin', 'querystring': ''}
+        placeholders = [
+            dict(field, id='field', arguments=dict(arguments,
+                                                   fieldname='first_name')),
+            dict(field, id='bogus', arguments=dict(arguments,
+                                                   fieldname='bogus')),
+            dict(field, id='no_field', arguments=arguments),
+        ]
+        response = self.post(self.superuser, {'placeholders': placeholders})
+        self.assertEqual(response.status_code, 200)
+        html = json.loads(response.content)['html']
+        self.assertEqual(sorted(html), ['field'])
+
+        class HidingAdmin(admin.ModelAdmin):
+            def get_queryset(self, request):
+                queryset = super(HidingAdmin, self).get_queryset(request)
+                return queryset.exclude(pk=request.user.pk)
+
+        self.site._registry = dict(admin.site._registry)
+        self.site._registry[User] = HidingAdmin(User, self.site)
+        html = json.loads(self.post(self.superuser, {
+            'placeholders': self.placeholders()}).content)['html']
+        self.assertEqual(html['edit'], '')
+
+    def test_bad_requests(self):
+        '''Only a JSON POST of a list of placeholders is accepted'''
+        from django.test.client import RequestFactory
+        request = RequestFactory().get('/')
+        request.user = self.superuser
+        self.assertEqual(self.site.placeholders_view(request).status_code, 405)
+        for data in ({}, {'placeholders': 'edit'}, [1]):
+            self.assertEqual(self.post(self.superuser, data).status_code, 400)
+
+    def test_editor_cookie_follows_the_admin(self):
+        '''Using the admin sets the cookie for editors, and removes it after'''
+        from django.test.client import RequestFactory
+        from adminlinks.constants import EDITOR_COOKIE
+        from django.http import HttpResponse
+        view = self.site.admin_view(lambda request: HttpResponse(''))
+        request = RequestFactory().get('/')
+        request.user = self.superuser
+        self.assertEqual(view(request).cookies[EDITOR_COOKIE].value, '1')
+        request.COOKIES[EDITOR_COOKIE] = '1'
+        self.assertFalse(EDITOR_COOKIE in view(request).cookies)
+        # signed out; the login form is shown instead.
+        request.user = AnonymousUser()
+        response = view(request)
+        self.assertEqual(response.cookies[EDITOR_COOKIE]['max-age'], 0)
+
+
+class LinksForTestCase(unittest.TestCase):
+    def setUp(self):
+        self.request = _staff_request('adminlinks_links_for', is_superuser=True)
+        self.users = [User.objects.get_or_create(username='adminlinks_links_for2')[0],
+                      self.request.user]
+
+    def test_links_in_order(self):
+        '''Every object gets its links, in the order given'''
+        from adminlinks import links_for
+        unsaved = User(username='adminlinks_unsaved')
+        links = links_for(self.request, self.users + [unsaved, 'nope'],
+                          views=('change', 'add'), query='a=1')
+        self.assertEqual(list(links), self.users)
+        for user in self.users:
+            self.assertEqual(links[user], {
+                'object': user,
+                'verbose_name': User._meta.verbose_name,
+                'change': reverse('admin:auth_user_change',
+                                  args=[user.pk]) + '?a=1',
+                'add': reverse('admin:auth_user_add') + '?a=1',
+            })
+
+    def test_permissions(self):
+        '''Links the user may not use are empty, or missing entirely'''
+        from django.contrib.auth.models import Permission
+        from adminlinks import links_for
+        request = HttpRequest()
+        request.user = AnonymousUser()
+        self.assertEqual(list(links_for(request, self.users)), [])
+        request = _staff_request('adminlinks_links_for_staff')
+        request.user.user_permissions = Permission.objects.filter(
+            content_type__app_label='auth', codename='change_user')
+        request.user = User.objects.get(pk=request.user.pk)
+        links = links_for(request, self.users)
+        self.assertEqual(links[self.users[0]]['delete'], '')
+        self.assertTrue(links[self.users[0]]['change'])
+        self.assertRaises(ValueError, links_for, request, self.users,
+                          views=('change', 'frobnicate'))
+
+
+class PermittedObjectsTestCase(unittest.TestCase):
+    def setUp(self):
+        from adminlinks.admin import AdminlinksMixin
+        checked = self.checked = []
+
+        class DefaultAdmin(AdminlinksMixin, admin.ModelAdmin):
+            def has_change_permission(self, request, obj=None):
+                checked.append(obj)
+                return True
+
+        class OwnUserAdmin(DefaultAdmin):
+            def get_permitted_objects(self, request, objs, action):
+                checked.append([obj.pk for obj in objs])
+                return [obj for obj in objs if obj == request.user]
+
+        self.admins = DefaultAdmin, OwnUserAdmin
+        self.request = _staff_request('adminlinks_permitted', is_superuser=True)
+        self.users = [self.request.user, User.objects.get_or_create(
+            username='adminlinks_permitted2')[0]]
+
+    def index(self, admin_class):
+        from adminlinks.templatetags.utils import get_modeladmin_index
+        site = admin.AdminSite(name='adminlinks_permitted')
+        site.register(User, admin_class)
+        return get_modeladmin_index(self.request, site)
+
+    def test_model_permissions_by_default(self):
+        '''Unless overridden, objects aren't checked one by one'''
+        index = self.index(self.admins[0])
+        self.assertEqual(index.get_permitted_pks(('auth', 'user'), self.users,
+                                                 'change'), None)
+        self.assertTrue(index.has_object_permission(('auth', 'user'),
+                                                    self.users[1], 'history'))
+        self.assertEqual(self.checked, [])
+
+    def test_overridden(self):
+        '''The hook is asked about every object at once, and remembered'''
+        index = self.index(self.admins[1])
+        permitted = index.get_permitted_pks(('auth', 'user'), self.users,
+                                            'change')
+        self.assertEqual(permitted, set([self.request.user.pk]))
+        self.assertFalse(index.has_object_permission(('auth', 'user'),
+                                                     self.users[1], 'history'))
+        self.assertEqual(self.checked, [[user.pk for user in self.users]])
+
+
+class ChangeFieldFormTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import Permission
+        from django.contrib.contenttypes.models import ContentType
+        from adminlinks.admin import AdminlinksMixin, _change_field_forms
+
+        class PermissionAdmin(AdminlinksMixin, admin.ModelAdmin):
+            def formfield_for_foreignkey(self, db_field, request=None, **kwargs):
+                if db_field.name == 'content_type' and not request.user.is_superuser:
+                    kwargs['queryset'] = ContentType.objects.filter(
+                        app_label='auth')
+                return super(PermissionAdmin, self).formfield_for_foreignkey(
+                    db_field, request, **kwargs)
+
+        self.admin_class = PermissionAdmin
+        self.site = admin.AdminSite(name='adminlinks_change_field_form')
+        self.obj = Permission.objects.all()[0]
+        self.requests = (_staff_request('adminlinks_form_staff'),
+                         _staff_request('adminlinks_form_super',
+                                        is_superuser=True))
+        _change_field_forms.clear()
+        self.addCleanup(_change_field_forms.clear)
+
+    def choices(self, modeladmin, request):
+        form_class = modeladmin.get_change_field_form(
+            request, self.obj, 'content_type')[2]
+        queryset = form_class(instance=self.obj).fields['content_type'].queryset
+        return set(queryset.values_list('app_label', flat=True))
+
+    def test_form_per_request(self):
+        '''Each user gets the choices their own request allows'''
+        modeladmin = self.admin_class(self.obj.__class__, self.site)
+        self.assertEqual(self.choices(modeladmin, self.requests[0]),
+                         set(['auth']))
+        self.assertTrue(len(self.choices(modeladmin, self.requests[1])) > 1)
+        self.assertEqual(self.choices(modeladmin, self.requests[0]),
+                         set(['auth']))
+
+    def test_opt_in_cache_key(self):
+        '''Form classes are shared only between requests with the same key'''
+        class CachingAdmin(self.admin_class):
+            def get_change_field_form_cache_key(self, request, obj, fieldname):
+                return request.user.is_superuser
+
+        modeladmin = CachingAdmin(self.obj.__class__, self.site)
+        forms = [modeladmin.get_change_field_form(request, self.obj,
+                                                  'content_type')[2]
+                 for request in self.requests + self.requests]
+        self.assertIs(forms[0], forms[2])
+        self.assertIs(forms[1], forms[3])
+        self.assertIsNot(forms[0], forms[1])
+        self.assertEqual(self.choices(modeladmin, self.requests[0]),
+                         set(['auth']))
+
+
+class ChangeFieldObjectTestCase(unittest.TestCase):
+    def setUp(self):
+        from adminlinks.admin import AdminlinksMixin
+        self.request = _staff_request('adminlinks_field_object',
+                                      is_superuser=True)
+        self.user = User.objects.get_or_create(
+            username='adminlinks_field_object2',
+            defaults={'email': 'field@example.com', 'last_name': 'Object'})[0]
+        self.fetched = fetched = []
+
+        class UserAdmin(AdminlinksMixin, admin.ModelAdmin):
+            pass
+
+        class OwnUserAdmin(UserAdmin):
+            def get_object(self, request, object_id):
+                fetched.append(object_id)
+                if object_id != str(request.user.pk):
+                    return None
+                return super(OwnUserAdmin, self).get_object(request, object_id)
+
+        site = admin.AdminSite(name='adminlinks_field_object')
+        self.admins = (UserAdmin(User, site), OwnUserAdmin(User, site))
+
+    def test_only_fields(self):
+        '''Only the form's columns are fetched, and only they are saved'''
+        modeladmin = self.admins[0]
+        obj = modeladmin.get_change_field_object(
+            self.request, str(self.user.pk), ['first_name'])
+        self.assertTrue(obj._deferred)
+        self.assertEqual(modeladmin.get_change_field_object(
+            self.request, 'nope', ['first_name']), None)
+
+        User.objects.filter(pk=self.user.pk).update(last_name='Elsewhere')
+        form_class = modeladmin.get_change_field_form(
+            self.request, obj, 'first_name')[2]
+        form = form_class({'first_name': 'Changed'}, instance=obj)
+        self.assertTrue(form.is_valid())
+        modeladmin._save_change_field_form(self.request, form)
+        saved = User.objects.get(pk=self.user.pk)
+        self.assertEqual((saved.first_name, saved.last_name, saved.email),
+                         ('Changed', 'Elsewhere', 'field@example.com'))
+
+    def test_overridden_get_object(self):
+        '''An overridden get_object decides which object is edited'''
+        modeladmin = self.admins[1]
+        self.assertEqual(modeladmin.get_change_field_object(
+            self.request, str(self.user.pk), ['first_name']), None)
+        obj = modeladmin.get_change_field_object(
+            self.request, str(self.request.user.pk), ['first_name'])
+        self.assertEqual(obj, self.request.user)
+        self.assertFalse(getattr(obj, '_deferred', False))
+        self.assertEqual(self.fetched, [str(self.user.pk),
+                                        str(self.request.user.pk)])
+
+
+class ChangeFieldBulkTestCase(unittest.TestCase):
+    def setUp(self):
+        from django.test.utils import override_settings
+        from adminlinks.admin import AdminlinksMixin
+
+        class BulkUserAdmin(AdminlinksMixin, admin.ModelAdmin):
+            pass
+
+        self.modeladmin = BulkUserAdmin(User, admin.site)
+        self.request = _staff_request('adminlinks_bulk', is_superuser=True)
+        self.users = [User.objects.get_or_create(
+            username='adminlinks_bulk%d' % i)[0] for i in range(2)]
+        urls = override_settings(ROOT_URLCONF='adminlinks.tests')
+        urls.enable()
+        self.addCleanup(urls.disable)
+
+    def bulk(self, user, data=None, fieldname='first_name', modeladmin=None):
+        from django.contrib.messages.storage.cookie import CookieStorage
+        from django.test.client import RequestFactory
+        pks = ','.join(str(obj.pk) for obj in self.users)
+        if data is None:
+            request = RequestFactory().get('/', {'pks': pks})
+        else:
+            request = RequestFactory().post('/?pks=%s' % pks, data)
+        request._dont_enforce_csrf_checks = True
+        request._messages = CookieStorage(request)
+        request.user = user
+        modeladmin = modeladmin or self.modeladmin
+        return modeladmin.change_field_bulk(request, fieldname)
+
+    def test_get(self):
+        '''The form renders outside a popup, without single object links'''
+        response = self.bulk(self.request.user)
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode('utf-8')
+        self.assertIn('name="first_name"', content)
+        self.assertIn('breadcrumbs', content)
+        self.assertNotIn('historylink', content)
+        self.assertNotIn('viewsitelink', content)
+
+    def test_post(self):
+        '''Every object is changed, and a log entry added for each'''
+        from django.contrib.admin.models import LogEntry, CHANGE
+        from django.contrib.contenttypes.models import ContentType
+        response = self.bulk(self.request.user, {'first_name': 'Bulk'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(User.objects.filter(pk__in=[
+            obj.pk for obj in self.users]).values_list('first_name', flat=True)),
+            set(['Bulk']))
+        entries = LogEntry.objects.filter(
+            user=self.request.user, action_flag=CHANGE,
+            content_type=ContentType.objects.get_for_model(User))
+        self.assertEqual(sorted(entries.values_list('object_id', flat=True)),
+                         sorted(str(obj.pk) for obj in self.users))
+
+    def test_auto_now(self):
+        '''auto_now fields are set, though save() isn't called'''
+        from datetime import timedelta
+        from django.contrib.admin.models import LogEntry
+        from django.contrib.contenttypes.models import ContentType
+        from django.utils import timezone
+        from adminlinks.admin import AdminlinksMixin
+
+        class LogEntryAdmin(AdminlinksMixin, admin.ModelAdmin):
+            pass
+
+        content_type = ContentType.objects.get_for_model(User)
+        old = timezone.now() - timedelta(days=1)
+        self.users = [LogEntry.objects.create(
+            user=self.request.user, content_type=content_type, object_id='0',
+            object_repr='old', action_flag=1) for i in range(2)]
+        LogEntry.objects.filter(pk__in=[obj.pk for obj in self.users]).update(
+            action_time=old)
+        response = self.bulk(self.request.user,
+                             {'change_message': 'bulk', '_autoclose': '1'},
+                             fieldname='change_message',
+                             modeladmin=LogEntryAdmin(LogEntry, admin.site))
+        self.assertEqual(response.status_code, 200)
+        for entry in LogEntry.objects.filter(pk__in=[obj.pk for obj in self.users]):
+            self.assertEqual(entry.change_message, 'bulk')
+            self.assertTrue(entry.action_time > old)
+
+    def test_permission_denied(self):
+        '''Users who can't change every object are refused'''
+        from django.core.exceptions import PermissionDenied
+        staff = _staff_request('adminlinks_bulk_staff').user
+        self.assertRaises(PermissionDenied, self.bulk, staff,
+                          {'first_name': 'Denied'})
+
+        class OwnUserAdmin(self.modeladmin.__class__):
+            def get_permitted_objects(self, request, objs, action):
+                return [obj for obj in objs if obj.pk != objs[0].pk]
+
+        self.assertRaises(PermissionDenied, self.bulk, self.request.user,
+                          {'first_name': 'Denied'},
+                          modeladmin=OwnUserAdmin(User, admin.site))
+        self.assertFalse(User.objects.filter(first_name='Denied').exists())
+
+
+class ChangeFieldJSONTestCase(unittest.TestCase):
+    def setUp(self):
+        from adminlinks.admin import AdminlinksMixin
+
+        class JSONUserAdmin(AdminlinksMixin, admin.ModelAdmin):
+            pass
+
+        self.modeladmin = JSONUserAdmin(User, admin.site)
+        self.superuser = _staff_request('adminlinks_json',
+                                        is_superuser=True).user
+        self.obj = User.objects.get_or_create(
+            username='adminlinks_json2',
+            defaults={'email': 'json@example.com'})[0]
+
+    def change(self, user, fieldname, body, method='patch'):
+        from django.test.client import RequestFactory
+        request = getattr(RequestFactory(), method)(
+            '/', body, content_type='application/json')
+        request._dont_enforce_csrf_checks = True
+        request.user = user
+        return self.modeladmin.change_field_json(request, str(self.obj.pk),
+                                                 fieldname)
+
+    def test_patch(self):
+        '''The value is saved, and the change described'''
+        for method, value in (('patch', False), ('post', True)):
+            response = self.change(self.superuser, 'is_active',
+                                   json.dumps({'value': value}), method)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(json.loads(response.content.decode('utf-8')), {
+                'action': {'add': False, 'change': True, 'delete': False},
+                'object': {'pk': self.obj.pk, 'id': self.obj.pk}})
+            self.assertEqual(User.objects.get(pk=self.obj.pk).is_active, value)
+
+    def test_invalid(self):
+        '''Invalid values and requests are refused, and nothing saved'''
+        from django.http import Http404
+        for method in ('patch', 'post'):
+            response = self.change(self.superuser, 'email',
+                                   json.dumps({'value': 'not an email'}), method)
+            self.assertEqual(response.status_code, 400)
+            errors = json.loads(response.content.decode('utf-8'))['errors']
+            self.assertEqual(list(errors), ['email'])
+        self.assertEqual(User.objects.get(pk=self.obj.pk).email,
+                         'json@example.com')
+        self.assertEqual(self.change(self.superuser, 'email',
+                                     '{"val', 'post').status_code, 400)
+        self.assertEqual(self.change(self.superuser, 'email',
+                                     '', 'get').status_code, 405)
+        self.assertRaises(Http404, self.change, self.superuser, 'id',
+                          json.dumps({'value': 1}))
+
+    def test_permission_denied(self):
+        '''Users without the change permission can't change anything'''
+        from django.core.exceptions import PermissionDenied
+        staff = _staff_request('adminlinks_json_staff').user
+        self.assertRaises(PermissionDenied, self.change, staff, 'email',
+                          json.dumps({'value': 'denied@example.com'}))
+        self.assertEqual(User.objects.get(pk=self.obj.pk).email,
+                         'json@example.com')
+
+
+class SuccessResponseTestCase(unittest.TestCase):
+    def setUp(self):
+        from adminlinks.admin import AdminlinksMixin, _success_templates
+
+        class SuccessUserAdmin(AdminlinksMixin, admin.ModelAdmin):
+            pass
+
+        self.modeladmin = SuccessUserAdmin(User, admin.site)
+        self.request = _staff_request('adminlinks_success', is_superuser=True)
+        _success_templates.clear()
+        self.addCleanup(_success_templates.clear)
+
+    def test_template_cached(self):
+        '''The template is found once, until the loaders or settings change'''
+        import os
+        import shutil
+        import tempfile
+        from django.template import loader
+        from django.test.utils import override_settings
+        template = self.modeladmin.get_success_template(self.request)
+        self.assertIs(self.modeladmin.get_success_template(self.request),
+                      template)
+
+        loader.template_source_loaders = None
+        reloaded = self.modeladmin.get_success_template(self.request)
+        self.assertIsNot(reloaded, template)
+        self.assertIs(self.modeladmin.get_success_template(self.request),
+                      reloaded)
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        os.makedirs(os.path.join(root, 'adminlinks', 'auth'))
+        with open(os.path.join(root, 'adminlinks', 'auth', 'success.html'),
+                  'w') as f:
+            f.write('auth success')
+        with override_settings(TEMPLATE_DIRS=(root,)):
+            template = self.modeladmin.get_success_template(self.request)
+            self.assertEqual(template.render(Context()), 'auth success')
+        self.assertNotEqual(
+            self.modeladmin.get_success_template(self.request).render(
+                Context({'json': '{}'})), 'auth success')
+
+    def test_post_message_escaped(self):
+        '''The JSON can't end its script element, and decodes unchanged'''
+        self.modeladmin.success_post_message = True
+        data = {'object': {'pk': '</script><script>alert(1)</script>',
+                           'id': '&amp; <!--'}}
+        response = self.modeladmin.render_success_response(self.request, data)
+        content = response.content.decode('utf-8')
+        marker = 'id="django-adminlinks-success">'
+        start = content.index(marker) + len(marker)
+        payload = content[start:content.index('</script>', start)]
+        for char in '<>&':
+            self.assertNotIn(char, payload)
+        self.assertEqual(json.loads(payload), data)
+        self.assertIn('adminlinks/js/success.js', content)
+        self.assertIn('max-age=0', response['Cache-Control'])
+
+
+class BundleTestCase(unittest.TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        self.output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output)
+        self.addCleanup(self.reset_staticfiles)
+        self.request = _staff_request('adminlinks_bundle', is_superuser=True)
+
+    def reset_staticfiles(self):
+        # both are set up once, from the settings at the time.
+        from django.contrib.staticfiles import finders
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        from django.utils.functional import empty
+        if hasattr(finders.get_finder, 'cache_clear'):
+            finders.get_finder.cache_clear()
+        else:  # < Django 1.7
+            finders._finders.clear()
+        staticfiles_storage._wrapped = empty
+
+    def render(self, **overrides):
+        from django.test.utils import override_settings
+        template = Template('{% load adminlinks_assets %}'
+                            '{% render_adminlinks_css %}'
+                            '{% render_adminlinks_js async %}')
+        with override_settings(ADMINLINKS_BUNDLE=True, **overrides):
+            self.reset_staticfiles()
+            return template.render(RequestContext(self.request))
+
+    def test_bundle(self):
+        '''The built files are used in place of the separate ones'''
+        import os
+        from django.core.management import call_command
+        from django.utils.six import StringIO
+        from adminlinks.constants import BUNDLE_CSS_NAME, BUNDLE_JS_NAME
+        call_command('adminlinks_bundle', output=self.output, stdout=StringIO())
+        for name in (BUNDLE_CSS_NAME, BUNDLE_JS_NAME):
+            self.assertTrue(os.path.getsize(os.path.join(self.output, name)))
+
+        content = self.render(DEBUG=True, STATICFILES_DIRS=(self.output,))
+        self.assertIn('href="/static/%s"' % BUNDLE_CSS_NAME, content)
+        self.assertIn('src="/static/%s" async' % BUNDLE_JS_NAME, content)
+        self.assertNotIn('widgets.css', content)
+        self.assertNotIn('adminlinks.js', content)
+
+    def test_not_built(self):
+        '''Until the bundles are built and collected, nothing breaks'''
+        import logging
+        warnings = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                warnings.append(record)
+
+        handler = Handler()
+        logger = logging.getLogger('adminlinks.templatetags.adminlinks_assets')
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        storage = 'django.contrib.staticfiles.storage.CachedStaticFilesStorage'
+        for overrides in ({'DEBUG': True},
+                          {'STATICFILES_STORAGE': storage,
+                           'STATIC_ROOT': self.output}):
+            content = self.render(**overrides)
+            self.assertNotIn('bundle.min', content)
+            self.assertIn('adminlinks/css/widgets.css', content)
+            self.assertIn('adminlinks/js/adminlinks.js" defer', content)
+        self.assertEqual(len(warnings), 4)
+
+    def test_minify_css(self):
+        '''Comment markers in strings are left alone'''
+        from adminlinks.management.commands.adminlinks_bundle import minify_css
+        source = 'a { content: "/* not a comment */"; background: url(/*.png) }'
+        self.assertIn('"/* not a comment */"', minify_css(source))
+        self.assertIn('/*.png', minify_css(source))
+
+
+class PreloadTestCase(unittest.TestCase):
+    assets = ['/static/adminlinks/css/widgets.css',
+              '/static/adminlinks/css/fancyiframe-custom.css',
+              '/static/admin/js/jquery.min.js',
+              '/static/adminlinks/js/jquery.fancyiframe.js',
+              '/static/adminlinks/js/adminlinks.js']
+
+    def setUp(self):
+        self.request = _staff_request('adminlinks_preload', is_superuser=True)
+        self.request.META['REMOTE_ADDR'] = '127.0.0.1'
+
+    def process(self, request, status=200, content_type='text/html', **headers):
+        from django.http import HttpResponse
+        from adminlinks.middleware import PreloadMiddleware
+        response = HttpResponse(status=status, content_type=content_type)
+        for key, value in headers.items():
+            response[key] = value
+        return PreloadMiddleware().process_response(request, response)
+
+    def test_middleware(self):
+        '''Editors are told about every file, in the order they're loaded'''
+        response = self.process(self.request, Link='</other.css>; rel=preload')
+        self.assertEqual(response['Link'], ', '.join(
+            ['</other.css>; rel=preload'] +
+            ['<%s>; rel=preload; as=%s' % (url, 'style' if url.endswith('css')
+                                           else 'script')
+             for url in self.assets]))
+        self.assertIn('Cookie', response['Vary'])
+
+        self.request.user = AnonymousUser()
+        response = self.process(self.request)
+        self.assertFalse(response.has_header('Link'))
+        self.assertIn('Cookie', response['Vary'])
+
+    def test_middleware_skipped(self):
+        '''Other responses, and those before authentication, are left alone'''
+        from django.test.utils import override_settings
+        with override_settings(DEBUG=True):
+            for request, status in ((HttpRequest(), 301), (HttpRequest(), 200),
+                                    (self.request, 404), (self.request, 302)):
+                response = self.process(request, status)
+                self.assertFalse(response.has_header('Link'))
+                self.assertFalse(response.has_header('Vary'))
+        response = self.process(self.request, content_type='application/json')
+        self.assertFalse(response.has_header('Link'))
+
+    def test_middleware_debug(self):
+        '''Files whose urls change every time aren't preloaded'''
+        from django.test.utils import override_settings
+        with override_settings(DEBUG=True, INTERNAL_IPS=('127.0.0.1',)):
+            self.assertFalse(self.process(self.request).has_header('Link'))
+        with override_settings(DEBUG=True, INTERNAL_IPS=()):
+            self.assertTrue(self.process(self.request).has_header('Link'))
+
+    def render(self, source, request=None, **context):
+        template = Template('{% load adminlinks_assets %}' + source)
+        return template.render(RequestContext(request or self.request, context))
+
+    def test_preload_tag(self):
+        '''A preload link for each file, for editors only'''
+        content = self.render('{% render_adminlinks_preload %}')
+        for url in self.assets:
+            kind = 'style' if url.endswith('css') else 'script'
+            self.assertIn('<link rel="preload" href="%s" as="%s">' % (url, kind),
+                          content)
+        self.assertEqual(content.count('rel="preload"'), len(self.assets))
+        self.assertEqual(self.render('{% render_adminlinks_preload %}',
+                                     debug=True).strip(), '')
+        self.request.user = AnonymousUser()
+        self.assertEqual(self.render('{% render_adminlinks_preload %}').strip(),
+                         '')
+
+    def test_js_loading(self):
+        '''The separate scripts are deferred, even if async is asked for'''
+        for argument, loading in (('', ''), ('defer', ' defer'),
+                                  ('async', ' defer')):
+            content = self.render('{%% render_adminlinks_js %s %%}' % argument)
+            for url in self.assets[2:]:
+                self.assertIn('src="%s"%s>' % (url, loading), content)
+
+
+# an admin site with the placeholder and fragment views, in place of the
+# default one, for tests using ``ROOT_URLCONF='adminlinks.tests'``
+from django.conf.urls import include, patterns, url
+from adminlinks.admin import AdminlinksSiteMixin
+
+
+class _AdminlinksTestSite(AdminlinksSiteMixin, admin.AdminSite):
+    pass
+_test_site = _AdminlinksTestSite(name=admin.site.name)
+_test_site._registry = admin.site._registry
+
+
+def _esi_page(request, pk):
+    from django.http import HttpResponse
+    template = Template('{% load adminlinks_buttons %}'
+                        '[{% render_edit_button obj %}]')
+    return HttpResponse(template.render(RequestContext(request, {
+        'obj': User.objects.get(pk=pk), 'adminlinks_output_mode': 'esi'})))
+
+urlpatterns = patterns('',
+    url(r'^admin/', include(_test_site.urls)),
+    url(r'^esi/(?P<pk>\d+)/$', _esi_page),
+)
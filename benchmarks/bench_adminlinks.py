@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Microbenchmarks for the django-adminlinks template tags.
+
+A synthetic project is generated in memory, with 10, 100 and 1000 models
+registered to the default :class:`~django.contrib.admin.AdminSite` (no tables
+are created for them, as nothing needs to be saved) and three users:
+
+* ``superuser``, who may do anything.
+* ``staff``, who has the change and delete permissions for every model,
+  directly.
+* ``limited``, who is in a group with the add and change permissions for every
+  tenth model.
+
+Each template tag is then rendered for pages of 1, 50 and 500 buttons, with a
+new request every time, so nothing is carried between pages except what would
+be carried between real requests.
+
+Results are written as JSON, one object per line, so that two runs (say, of
+different releases) may be compared::
+
+    python benchmarks/bench_adminlinks.py --output before.json
+    python benchmarks/bench_adminlinks.py --output after.json
+    python benchmarks/bench_adminlinks.py --compare before.json after.json
+
+Comparing exits with a non-zero status if anything got slower than
+``--threshold`` (by default, 1.2 times the original median).
+"""
+from __future__ import print_function, unicode_literals
+import gc
+import json
+import os
+import platform
+import sys
+import types
+from optparse import OptionParser
+from timeit import default_timer
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+REGISTRY_SIZES = (10, 100, 1000)
+PAGE_SIZES = (1, 50, 500)
+USERS = ('superuser', 'staff', 'limited')
+APP_LABEL = 'adminlinks_bench'
+
+#: the name of each button tag, and how to render it for `obj`
+BUTTON_TAGS = (
+    ('render_edit_button', '{% render_edit_button obj %}'),
+    ('render_edit_field_button', '{% render_edit_field_button obj "title" %}'),
+    ('render_delete_button', '{% render_delete_button obj %}'),
+    ('render_add_button', '{% render_add_button obj %}'),
+    ('render_history_button', '{% render_history_button obj %}'),
+    ('render_changelist_button', '{% render_changelist_button obj %}'),
+    ('render_admin_buttons', '{% render_admin_buttons obj %}'),
+    ('render_admin_button', '{% render_admin_button %}'),
+    ('render_toggle_button', '{% render_toggle_button %}'),
+)
+
+
+def configure():
+    from django.conf import settings
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='benchmarks',
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3',
+                               'NAME': ':memory:'}},
+        ROOT_URLCONF='adminlinks_bench_urls',
+        INSTALLED_APPS=('django.contrib.admin', 'django.contrib.auth',
+                        'django.contrib.contenttypes',
+                        'django.contrib.sessions', 'adminlinks'),
+        STATIC_URL='/static/',
+        # as in production, templates shouldn't be read from disk every time.
+        TEMPLATE_LOADERS=(
+            ('django.template.loaders.cached.Loader', (
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            )),
+        ),
+        PASSWORD_HASHERS=('django.contrib.auth.hashers.MD5PasswordHasher',),
+    )
+    try:
+        import django
+        django.setup()
+    except AttributeError:  # < Django 1.7
+        pass
+
+
+def create_models(count):
+    from django.db import models
+    module = types.ModuleType(str('%s.models' % APP_LABEL))
+    sys.modules[module.__name__] = module
+    created = []
+    for index in range(count):
+        name = str('Model%04d' % index)
+        attrs = {
+            '__module__': module.__name__,
+            'Meta': type(str('Meta'), (object,), {'app_label': APP_LABEL}),
+            'title': models.CharField(max_length=50),
+            'flag': models.BooleanField(default=False),
+        }
+        model = type(name, (models.Model,), attrs)
+        setattr(module, name, model)
+        created.append(model)
+    return created
+
+
+def create_tables():
+    from django.core.management import call_command
+    try:
+        call_command('migrate', interactive=False, verbosity=0)
+    except Exception:  # < Django 1.7
+        call_command('syncdb', interactive=False, verbosity=0)
+
+
+def create_permissions(all_models):
+    from django.contrib.auth.models import Permission
+    from django.contrib.contenttypes.models import ContentType
+    permissions = {}
+    for model in all_models:
+        opts = model._meta
+        content_type = ContentType.objects.get_or_create(
+            app_label=opts.app_label, model=opts.object_name.lower(),
+            defaults={'name': opts.object_name})[0]
+        for action in ('add', 'change', 'delete'):
+            codename = '%s_%s' % (action, opts.object_name.lower())
+            permissions[(model, action)] = Permission.objects.get_or_create(
+                content_type=content_type, codename=codename,
+                defaults={'name': codename})[0]
+    return permissions
+
+
+def create_users(all_models, permissions):
+    from django.contrib.auth.models import Group, User
+    superuser = User.objects.create_superuser('superuser', 'x@x.com', 'x')
+    staff = User.objects.create_user('staff', 'x@x.com', 'x')
+    staff.is_staff = True
+    staff.save()
+    staff.user_permissions.add(*[permissions[(model, action)]
+                                 for model in all_models
+                                 for action in ('change', 'delete')])
+    limited = User.objects.create_user('limited', 'x@x.com', 'x')
+    limited.is_staff = True
+    limited.save()
+    group = Group.objects.create(name='limited')
+    group.permissions.add(*[permissions[(model, action)]
+                            for model in all_models[::10]
+                            for action in ('add', 'change')])
+    limited.groups.add(group)
+    return {'superuser': superuser.pk, 'staff': staff.pk,
+            'limited': limited.pk}
+
+
+def mount_registry(models):
+    """
+    Registers only the given models on the default admin site, and rebuilds
+    the URLconf to match.
+    """
+    from django.conf.urls import include, url
+    from django.contrib import admin
+    from django.core.urlresolvers import clear_url_caches
+    from adminlinks.admin import AdminlinksMixin
+
+    for model in list(admin.site._registry):
+        admin.site.unregister(model)
+    model_admin = type(str('BenchAdmin'), (AdminlinksMixin, admin.ModelAdmin),
+                       {})
+    for model in models:
+        admin.site.register(model, model_admin)
+
+    urls = types.ModuleType(str('adminlinks_bench_urls'))
+    urls.urlpatterns = [url(r'^admin/', include(admin.site.urls))]
+    sys.modules[urls.__name__] = urls
+    clear_url_caches()
+
+
+def make_request(user_pk):
+    """
+    A brand new request (and user) every time, so that nothing cached on
+    either survives into the next iteration.
+    """
+    from django.contrib.auth.models import User
+    from django.test.client import RequestFactory
+    request = RequestFactory().get('/')
+    request.user = User.objects.get(pk=user_pk)
+    # warm the user's permissions, as any other middleware or view would
+    # probably have done, so the database isn't what's being measured.
+    request.user.get_all_permissions()
+    return request
+
+
+def measure(func, setup, repeat):
+    timings = []
+    for _ in range(repeat):
+        args = setup()
+        gc.disable()
+        try:
+            start = default_timer()
+            func(*args)
+            timings.append(default_timer() - start)
+        finally:
+            gc.enable()
+    timings.sort()
+    return {
+        'min': timings[0],
+        'median': timings[len(timings) // 2],
+        'mean': sum(timings) / len(timings),
+        'max': timings[-1],
+        'repeat': repeat,
+    }
+
+
+def benchmarks(models, users, repeat):
+    """
+    Yields the name and parameters of each benchmark, alongside its timings.
+    """
+    from django.contrib import admin
+    from django.template import Context, Template
+    from adminlinks.templatetags.utils import (get_registered_modeladmins,
+                                               _admin_link_shortcut)
+
+    for user in USERS:
+        user_pk = users[user]
+
+        def setup():
+            return (make_request(user_pk),)
+
+        def registered(request):
+            get_registered_modeladmins(request, admin.site)
+        yield ('get_registered_modeladmins', {'user': user},
+               measure(registered, setup, repeat))
+
+        for page_size in PAGE_SIZES:
+            objects = [models[index % len(models)](pk=index + 1)
+                       for index in range(page_size)]
+
+            def shortcuts(request):
+                for obj in objects:
+                    opts = obj._meta
+                    '%s' % _admin_link_shortcut(
+                        '%s:%s_%s_change' % (admin.site.name, opts.app_label,
+                                             opts.object_name.lower()),
+                        [obj.pk])
+            yield ('_admin_link_shortcut',
+                   {'user': user, 'buttons': page_size},
+                   measure(shortcuts, setup, repeat))
+
+            tags = BUTTON_TAGS + (
+                ('adminlinks_for',
+                 '{% adminlinks_for objects as links %}'
+                 '{% for pk, item in links.items %}{{ item.change }}'
+                 '{% endfor %}'),
+            )
+            for name, source in tags:
+                if name == 'adminlinks_for':
+                    template = Template('{% load adminlinks_buttons %}' +
+                                        source)
+                else:
+                    template = Template('{% load adminlinks_buttons %}'
+                                        '{% for obj in objects %}' + source +
+                                        '{% endfor %}')
+
+                def render(request, template=template):
+                    template.render(Context({'request': request,
+                                             'objects': objects}))
+                yield (name, {'user': user, 'buttons': page_size},
+                       measure(render, setup, repeat))
+
+        toolbar = Template('{% load adminlinks_toolbar %}'
+                           '{% render_adminlinks_toolbar %}')
+
+        def render_toolbar(request):
+            toolbar.render(Context({'request': request}))
+        yield ('render_adminlinks_toolbar', {'user': user},
+               measure(render_toolbar, setup, repeat))
+
+
+def run(options):
+    configure()
+    import django
+    import adminlinks
+    all_models = create_models(max(options.models))
+    create_tables()
+    permissions = create_permissions(all_models)
+    users = create_users(all_models, permissions)
+
+    output = sys.stdout
+    if options.output:
+        output = open(options.output, 'w')
+    environment = {
+        'adminlinks': adminlinks.__version__,
+        'django': django.get_version(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+    }
+    try:
+        for size in options.models:
+            mount_registry(all_models[:size])
+            results = benchmarks(all_models[:size], users, options.repeat)
+            for name, params, timings in results:
+                if options.only and name not in options.only:
+                    continue
+                result = {'benchmark': name, 'models': size}
+                result.update(params)
+                result.update(timings)
+                result.update(environment)
+                output.write(json.dumps(result, sort_keys=True) + '\n')
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def _load(path):
+    results = {}
+    with open(path) as handle:
+        for line in handle:
+            if line.strip():
+                result = json.loads(line)
+                key = (result['benchmark'], result['models'],
+                       result['user'], result.get('buttons'))
+                results[key] = result
+    return results
+
+
+def compare(before_path, after_path, threshold):
+    before = _load(before_path)
+    after = _load(after_path)
+    regressions = 0
+    for key in sorted(set(before) & set(after), key=lambda k: [str(x) for x in k]):
+        ratio = after[key]['median'] / before[key]['median']
+        flag = ''
+        if ratio > threshold:
+            flag = '  <-- slower'
+            regressions += 1
+        print('%-28s models=%-5s user=%-10s buttons=%-4s %8.3fms -> %8.3fms '
+              '(%.2fx)%s' % (key[0], key[1], key[2], key[3] or '-',
+                             before[key]['median'] * 1000,
+                             after[key]['median'] * 1000, ratio, flag))
+    return 1 if regressions else 0
+
+
+def main():
+    parser = OptionParser(usage='%prog [options] | --compare BEFORE AFTER')
+    parser.add_option('--models', default=','.join(map(str, REGISTRY_SIZES)),
+                      help='comma separated registry sizes [%default]')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='timings taken per benchmark [%default]')
+    parser.add_option('--only', default='',
+                      help='comma separated benchmark names to run')
+    parser.add_option('--output', default='',
+                      help='file to write JSON lines to, instead of stdout')
+    parser.add_option('--compare', action='store_true', default=False,
+                      help='compare two previous outputs')
+    parser.add_option('--threshold', type='float', default=1.2,
+                      help='slowdown ratio considered a regression [%default]')
+    options, args = parser.parse_args()
+    if options.compare:
+        if len(args) != 2:
+            parser.error('--compare needs two files')
+        sys.exit(compare(args[0], args[1], options.threshold))
+    options.models = sorted(int(size) for size in options.models.split(','))
+    options.only = [name for name in options.only.split(',') if name]
+    run(options)
+
+
+if __name__ == '__main__':
+    main()